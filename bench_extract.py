@@ -0,0 +1,267 @@
+"""
+Extraction Backend Benchmark
+----------------------------
+Compares the backends in `pdf_extract.py` on throughput and paragraph
+agreement, so we can pick the fastest backend that is good enough.
+
+Synthetic editions are multi-column PDFs generated here with known paragraphs
+(ground truth), once with aligned column baselines and once with every other
+column's baselines shifted, as in real newspaper layouts. Real editions passed
+on the command line are scored against the reference backend (pdfplumber by
+default). A backend is only recommended if it reaches --min-f1 on every
+edition, not just on average.
+
+Usage:
+    python bench_extract.py                           # synthetic only
+    python bench_extract.py Report.pdf other.pdf      # synthetic + real editions
+    python bench_extract.py Report.pdf --backends pdfplumber,pypdfium2
+"""
+
+import argparse
+import os
+import random
+import re
+import tempfile
+import time
+from typing import Dict, List, Optional, Tuple
+
+from pdf_extract import EXTRACTION_BACKENDS, extract_pages, segment_paragraphs
+
+PDF_BACKENDS = [b for b in EXTRACTION_BACKENDS if b != "text"]
+MATCH_THRESHOLD = 0.9  # token Jaccard needed for two paragraphs to "agree"
+
+SYNTHETIC_WORDS = (
+    "police arrested two men near the bus depot after a chain snatching "
+    "complaint from residents of velachery a fire broke out in a godown "
+    "commuters were stranded as traffic was diverted following a collision "
+    "on the arterial road officials announced new cctv cameras and patrols "
+    "the corporation said the drain work would finish before the monsoon "
+    "a woman was injured when a tree fell on her two wheeler in mylapore"
+).split()
+
+
+# --- Synthetic multi-column editions ---
+def _pdf_escape(s: str) -> str:
+    return s.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def _wrap(words: List[str], width: int) -> List[str]:
+    lines, cur = [], ""
+    for w in words:
+        if cur and len(cur) + 1 + len(w) > width:
+            lines.append(cur)
+            cur = w
+        else:
+            cur = f"{cur} {w}" if cur else w
+    if cur:
+        lines.append(cur)
+    return lines
+
+
+def write_synthetic_edition(path: str, pages: int = 4, columns: int = 3,
+                            seed: int = 7, stagger: float = 0.0) -> List[str]:
+    """
+    Write a minimal multi-column PDF (Helvetica, one text object per line)
+    and return its paragraphs in reading order. `stagger` shifts the
+    baselines of every other column down by that many points.
+    """
+    rng = random.Random(seed)
+    page_w, page_h, margin = 595, 842, 36
+    font_size, leading = 8, 10
+    col_pitch = (page_w - 2 * margin) / columns
+    # Helvetica averages ~0.55em per lowercase glyph; leave a wide gutter
+    chars_per_line = int((col_pitch - 36) / (font_size * 0.55))
+
+    truth: List[str] = []
+    streams: List[bytes] = []
+    for _ in range(pages):
+        ops = ["BT", f"/F1 {font_size} Tf"]
+        for c in range(columns):
+            x = margin + c * col_pitch
+            y = page_h - margin - (stagger if c % 2 else 0.0)
+            while True:
+                words = [rng.choice(SYNTHETIC_WORDS) for _ in range(rng.randint(25, 60))]
+                words[0] = words[0].capitalize()
+                lines = _wrap(words, chars_per_line)
+                if y - len(lines) * leading < margin:
+                    break
+                for ln in lines:
+                    ops.append(f"1 0 0 1 {x:.1f} {y:.1f} Tm ({_pdf_escape(ln)}) Tj")
+                    y -= leading
+                y -= leading  # blank line between paragraphs
+                truth.append(" ".join(lines))
+        ops.append("ET")
+        streams.append("\n".join(ops).encode("latin-1"))
+
+    # object layout: 1 catalog, 2 pages, 3 font, then (page, content) pairs
+    objs: Dict[int, bytes] = {
+        1: b"<< /Type /Catalog /Pages 2 0 R >>",
+        3: b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    }
+    kids = []
+    for i, stream in enumerate(streams):
+        page_id, content_id = 4 + 2 * i, 5 + 2 * i
+        kids.append(f"{page_id} 0 R")
+        objs[page_id] = (
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {page_w} {page_h}] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {content_id} 0 R >>"
+        ).encode()
+        objs[content_id] = (
+            f"<< /Length {len(stream)} >>\nstream\n".encode() + stream + b"\nendstream"
+        )
+    objs[2] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>".encode()
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = {}
+    for oid in sorted(objs):
+        offsets[oid] = len(out)
+        out += f"{oid} 0 obj\n".encode() + objs[oid] + b"\nendobj\n"
+    xref_at = len(out)
+    out += f"xref\n0 {len(objs) + 1}\n0000000000 65535 f \n".encode()
+    for oid in sorted(objs):
+        out += f"{offsets[oid]:010d} 00000 n \n".encode()
+    out += f"trailer\n<< /Size {len(objs) + 1} /Root 1 0 R >>\nstartxref\n{xref_at}\n%%EOF\n".encode()
+
+    with open(path, "wb") as f:
+        f.write(out)
+    return truth
+
+
+# --- Scoring ---
+def _tokens(s: str) -> frozenset:
+    return frozenset(re.findall(r"[a-z0-9]+", s.lower()))
+
+
+def _jaccard(a: frozenset, b: frozenset) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+def paragraph_agreement(reference: List[str], candidate: List[str]) -> Dict[str, float]:
+    """Precision/recall/F1 of candidate paragraphs matched against reference ones."""
+    ref = [_tokens(p) for p in reference]
+    cand = [_tokens(p) for p in candidate]
+
+    def matched(src, dst):
+        hits = 0
+        for t in src:
+            if any(_jaccard(t, u) >= MATCH_THRESHOLD for u in dst):
+                hits += 1
+        return hits
+
+    recall = matched(ref, cand) / len(ref) if ref else 1.0
+    precision = matched(cand, ref) / len(cand) if cand else (1.0 if not ref else 0.0)
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    return {"precision": precision, "recall": recall, "f1": f1}
+
+
+def run_backend(path: str, backend: str, repeat: int = 1) -> Tuple[List[str], int, float]:
+    """Return (paragraphs, page_count, best wall time in seconds)."""
+    best = float("inf")
+    paragraphs: List[str] = []
+    pages = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        paragraphs, pages = [], 0
+        for text in extract_pages(path, backend):
+            pages += 1
+            paragraphs.extend(segment_paragraphs(text))
+        best = min(best, time.perf_counter() - start)
+    return paragraphs, pages, best
+
+
+def benchmark(editions: List[Tuple[str, Optional[List[str]]]], backends: List[str],
+              reference: str, repeat: int) -> Dict[str, Dict[str, float]]:
+    """
+    Run every backend over every edition. Editions with ground truth are scored
+    against it; the others against the reference backend's output.
+    """
+    totals = {b: {"pages": 0, "seconds": 0.0, "f1_sum": 0.0, "f1_min": 1.0,
+                  "editions": 0, "errors": 0}
+              for b in backends}
+    for path, truth in editions:
+        print(f"\n📄 {os.path.basename(path)}")
+        ref_paras = truth
+        if ref_paras is None:
+            try:
+                ref_paras, _, _ = run_backend(path, reference)
+            except ImportError as e:
+                print(f"  ⚠️  Reference backend '{reference}' unavailable ({e}); skipping")
+                continue
+        for backend in backends:
+            try:
+                paras, pages, secs = run_backend(path, backend, repeat)
+            except ImportError as e:
+                print(f"  ⏭️  {backend:<11} not installed ({e.name})")
+                totals[backend]["errors"] += 1
+                continue
+            agree = paragraph_agreement(ref_paras, paras)
+            rate = pages / secs if secs else float("inf")
+            print(f"  {backend:<11} {rate:8.1f} pages/s  {len(paras):5d} paras  "
+                  f"P={agree['precision']:.2f} R={agree['recall']:.2f} F1={agree['f1']:.2f}")
+            t = totals[backend]
+            t["pages"] += pages
+            t["seconds"] += secs
+            t["f1_sum"] += agree["f1"]
+            t["f1_min"] = min(t["f1_min"], agree["f1"])
+            t["editions"] += 1
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark PDF extraction backends")
+    parser.add_argument("editions", nargs="*", help="real PDF editions to include")
+    parser.add_argument("--backends", default=",".join(PDF_BACKENDS))
+    parser.add_argument("--reference", default="pdfplumber",
+                        help="backend treated as ground truth for real editions")
+    parser.add_argument("--synthetic-pages", type=int, default=4)
+    parser.add_argument("--columns", type=int, default=3)
+    parser.add_argument("--stagger", type=float, default=6.0,
+                        help="baseline offset (pt) of the staggered synthetic edition; 0 to skip it")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per measurement (best is kept)")
+    parser.add_argument("--min-f1", type=float, default=0.9,
+                        help="agreement needed for a backend to be recommended")
+    args = parser.parse_args()
+
+    backends = [b.strip() for b in args.backends.split(",") if b.strip()]
+    for b in backends:
+        if b not in EXTRACTION_BACKENDS:
+            parser.error(f"unknown backend '{b}'")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        editions: List[Tuple[str, Optional[List[str]]]] = []
+        if args.synthetic_pages > 0:
+            synth = os.path.join(tmp, f"synthetic_{args.columns}col.pdf")
+            truth = write_synthetic_edition(synth, args.synthetic_pages, args.columns)
+            editions.append((synth, truth))
+            if args.stagger:
+                synth = os.path.join(tmp, f"synthetic_{args.columns}col_staggered.pdf")
+                truth = write_synthetic_edition(synth, args.synthetic_pages, args.columns,
+                                                stagger=args.stagger)
+                editions.append((synth, truth))
+        editions.extend((p, None) for p in args.editions)
+
+        totals = benchmark(editions, backends, args.reference, args.repeat)
+
+    print("\n📊 Summary")
+    candidates = []
+    for backend, t in totals.items():
+        if not t["editions"]:
+            continue
+        rate = t["pages"] / t["seconds"] if t["seconds"] else float("inf")
+        mean_f1 = t["f1_sum"] / t["editions"]
+        print(f"  {backend:<11} {rate:8.1f} pages/s  mean F1={mean_f1:.2f}  min F1={t['f1_min']:.2f}")
+        # easy editions must not mask a bad one, so the worst edition decides
+        if t["f1_min"] >= args.min_f1:
+            candidates.append((rate, backend))
+    if candidates:
+        rate, best = max(candidates)
+        print(f"\n✅ Recommended: {best} (fastest with F1 >= {args.min_f1} on every edition)")
+        print(f"   $env:EXTRACT_BACKEND = \"{best}\"")
+    else:
+        print(f"\n⚠️  No backend reached F1 >= {args.min_f1} on every edition")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Response Mode Comparison
+------------------------
+Runs the Gemini request path of `main.py` against a stub client in both
+response modes and checks that the compact response is smaller and
+rehydrates to exactly the full-mode locations. The stub answers like the
+model would (locations and categories come from the local fallback rules),
+so no API key or network access is needed.
+
+Without arguments the check runs on a few built-in paragraphs (no PDF or
+PDF library needed); pass an edition to measure real paragraphs too. Exits
+non-zero if a check fails.
+
+Usage:
+    python bench_response_modes.py [edition.pdf|.txt|.html]
+"""
+
+import json
+import sys
+
+from main import (CompactOutput, extract_paragraphs_from_pdf, is_relevant,
+                  local_fallback_process_chunk, merge_model_locations,
+                  request_chunk_locations)
+
+CHARS_PER_TOKEN = 4  # rough output-token estimate for English JSON
+
+SAMPLE_PARAGRAPHS = [
+    "Two men were arrested in Anna Nagar on Tuesday after a chain snatching "
+    "complaint from a resident, police said.",
+    "A collision between a bus and a lorry near Central Station left three "
+    "commuters injured during the morning rush.",
+    "Residents of Velachery staged a protest over waterlogging that has "
+    "disrupted traffic on the main road for a week.",
+    "The corporation announced new CCTV cameras and street lights in Mylapore "
+    "as a safety measure ahead of the festival season.",
+    "A man was killed in a stabbing near the Tambaram bus terminus late on "
+    "Sunday night; police have registered a case.",
+]
+
+
+class _StubResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class StubClient:
+    """Mimics `genai.Client().models.generate_content` and records response sizes."""
+
+    def __init__(self):
+        self.models = self
+        self.response_chars = []
+
+    def generate_content(self, model, contents, config):
+        compact = config["response_json_schema"].get("title") == CompactOutput.__name__
+        # every paragraph follows its own "===PARA===" / "===PARA n===" marker line
+        paragraphs = [block.split("\n", 1)[1].strip() for block in contents.split("\n===PARA")[1:]]
+        locations = {}
+        for n, para in enumerate(paragraphs, 1):
+            for loc, data in local_fallback_process_chunk([para]).items():
+                items = data["incidents"] + data["positive_events"]
+                if compact:
+                    entries = locations.setdefault(loc, {"entries": []})["entries"]
+                    entries.extend({"para_id": n, "type": i["type"], "description": i["description"]}
+                                   for i in items)
+                else:
+                    out = locations.setdefault(loc, {
+                        "incidents": [], "positive_events": [],
+                        "score_before_clamp": 0, "final_score_10_scale": 0,
+                    })
+                    out["incidents"].extend(data["incidents"])
+                    out["positive_events"].extend(data["positive_events"])
+        body = {"locations": locations}
+        if not compact:
+            body["algorithm_used"] = {"base_score": 10, "crime_penalties": {}, "positive_additions": {}}
+            body["summary"] = ""
+        text = json.dumps(body, ensure_ascii=False)
+        self.response_chars.append(len(text))
+        return _StubResponse(text)
+
+
+def compare_response_modes(paragraphs):
+    """Return {mode: (merged locations, response chars)} for both response modes."""
+    results = {}
+    for mode in ("full", "compact"):
+        client = StubClient()
+        locs = request_chunk_locations(client, "stub", paragraphs, response_mode=mode)
+        results[mode] = (merge_model_locations([locs]), sum(client.response_chars))
+    return results
+
+
+def check_response_modes(paragraphs, label):
+    """
+    Print the size comparison and return failed checks: compact must be
+    smaller and rehydrate to exactly the full output.
+    """
+    results = compare_response_modes(paragraphs)
+    full_locs, full_chars = results["full"]
+    compact_locs, compact_chars = results["compact"]
+    print(f"📄 {label}: {len(paragraphs)} relevant paragraphs, {len(full_locs)} locations")
+    for mode, (_, chars) in results.items():
+        print(f"  {mode:<8} {chars:8d} response chars  ~{chars // CHARS_PER_TOKEN:6d} output tokens")
+    saved = 1 - compact_chars / full_chars if full_chars else 0.0
+    print(f"  compact response is {saved:.0%} smaller")
+
+    failures = []
+    if not full_locs:
+        failures.append("stub returned no locations")
+    if compact_locs != full_locs:
+        failures.append("rehydrated compact output differs from full output")
+    if compact_chars >= full_chars:
+        failures.append(f"compact response ({compact_chars} chars) is not smaller than full ({full_chars})")
+    if not failures:
+        print("✅ Compact output is smaller and rehydrates to the full output")
+    return failures
+
+
+def main():
+    editions = [("built-in sample", SAMPLE_PARAGRAPHS)]
+    for path in sys.argv[1:]:
+        relevant = [p for p in extract_paragraphs_from_pdf(path) if is_relevant(p)]
+        if not relevant:
+            print(f"No relevant crime/safety paragraphs found in {path}.")
+            sys.exit(1)
+        editions.append((path, relevant))
+
+    failed = False
+    for label, paragraphs in editions:
+        for failure in check_response_modes(paragraphs, label):
+            print(f"❌ {label}: {failure}")
+            failed = True
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Scoring Consistency Check
+-------------------------
+Checks that incremental scoring (`delta_scoring.ScoringState`) agrees with the
+full recompute in `main.py`: one batch applied to an empty state must give
+the same place scores as `compute_scores` and the same city scores as
+`aggregate_city_scores`.
+
+Locations come from the local fallback rules, so no API key or network access
+is needed. Without arguments the check runs on the built-in sample paragraphs
+of `bench_response_modes.py`; pass editions to check their paragraphs too.
+Exits non-zero on any mismatch.
+
+Usage:
+    python check_scoring.py [edition.pdf|.txt|.html ...]
+"""
+
+import sys
+
+from bench_response_modes import SAMPLE_PARAGRAPHS
+from delta_scoring import ScoringState
+from main import (BASE_SCORE, CRIME_PENALTIES, POSITIVE_ADDITIONS, aggregate_city_scores,
+                  build_output_locations, compute_scores, detect_city,
+                  extract_paragraphs_from_pdf, is_relevant, local_fallback_process_chunk)
+
+
+def score_mismatches(locations):
+    """Compare full and incremental scores for one batch; returns mismatch descriptions."""
+    scored = compute_scores(locations)
+    cities = aggregate_city_scores(build_output_locations(scored))
+
+    state = ScoringState(BASE_SCORE, {**CRIME_PENALTIES, **POSITIVE_ADDITIONS}, 0, 10,
+                         city_of=detect_city)
+    state.apply_batch(locations)
+
+    mismatches = []
+    for place, data in scored.items():
+        full, delta = data["final_score_10_scale"], state.place_score(place)
+        if full != delta:
+            mismatches.append(f"place {place!r}: full {full} != incremental {delta}")
+    for city, info in cities.items():
+        full, delta = info["final_score_10_scale"], state.city_score(city)
+        if full != delta:
+            mismatches.append(f"city {city!r}: full {full} != incremental {delta}")
+    return mismatches
+
+
+def main():
+    editions = [("built-in sample", SAMPLE_PARAGRAPHS)]
+    for path in sys.argv[1:]:
+        editions.append((path, [p for p in extract_paragraphs_from_pdf(path) if is_relevant(p)]))
+
+    failed = False
+    for label, paragraphs in editions:
+        locations = local_fallback_process_chunk(paragraphs)
+        mismatches = score_mismatches(locations)
+        if mismatches:
+            failed = True
+            print(f"❌ {label}: {len(mismatches)} mismatch(es)")
+            for m in mismatches:
+                print(f"  {m}")
+        else:
+            print(f"✅ {label}: {len(locations)} places, incremental scores match the full recompute")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
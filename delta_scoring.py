@@ -0,0 +1,260 @@
+"""
+Delta Scoring
+-------------
+Incremental safety scores: per-place running totals persisted locally, so a
+new batch of incidents only touches the places (and parent cities) it
+mentions instead of rescoring the whole archive.
+
+A place's score is `clamp(base_score + raw)`, where raw is the sum of the
+category weights of every incident seen so far. Per-category counts are kept
+too, so changing the weights rescores from counts without re-reading old
+editions. A city's raw total is the sum of its places' raw totals and, like
+`main.aggregate_city_scores`, its score is `clamp(raw)` with no base (base
+only while it has no incidents).
+
+Each state file belongs to one scale (base, min, max): `main.py` scores 0-10
+and `ingest_to_supabase.py` 0-100, so they must not share a file. Loading a
+file saved on another scale is an error rather than a silent rescore.
+
+Usage:
+    python delta_scoring.py apply Report_parsed.json [--state scoring_state.json]
+    python delta_scoring.py rebuild [columnar_export]    # needs pyarrow
+    python delta_scoring.py show [--state scoring_state.json]
+"""
+
+import argparse
+import json
+import os
+from typing import Any, Callable, Dict, Optional
+
+from incident_index import edition_source
+
+# state of ingest_to_supabase.py (0-100); main.py uses ANALYSIS_SCORE_STATE_PATH
+DEFAULT_STATE_PATH = os.environ.get("SCORE_STATE_PATH", "scoring_state.json")
+STATE_VERSION = 2  # 2: city score is clamp(sum of place raw), no base
+
+# 0-100 place scores written to Supabase by ingest_to_supabase.py
+SAFETY_SCORE_BASE = 100.0
+SAFETY_SCORE_WEIGHTS = {
+    "violent_crime": -15,
+    "property_crime": -10,
+    "accident": -8,
+    "public_disturbance": -5,
+    "safety_measure": 5,
+}
+
+
+def _clamp(value: float, lo: float, hi: float) -> float:
+    return max(lo, min(hi, value))
+
+
+class ScoringState:
+    """Running per-place and per-city score totals."""
+
+    def __init__(self, base_score: float, weights: Dict[str, float],
+                 min_score: float, max_score: float,
+                 city_of: Optional[Callable[[str], Optional[str]]] = None):
+        self.base_score = base_score
+        self.weights = dict(weights)
+        self.min_score = min_score
+        self.max_score = max_score
+        self.city_of = city_of
+        self.places: Dict[str, Dict[str, Any]] = {}
+        self.cities: Dict[str, Dict[str, Any]] = {}
+        self.applied_batches: list = []
+        # scores changed by a weight change at load time, reported by the next apply_batch
+        self._pending: Dict[str, Dict[str, float]] = {"places": {}, "cities": {}}
+
+    # --- persistence ---
+    @classmethod
+    def load(cls, path: str, base_score: float, weights: Dict[str, float],
+             min_score: float, max_score: float,
+             city_of: Optional[Callable[[str], Optional[str]]] = None) -> "ScoringState":
+        """
+        Load saved totals, or start empty. Rescores everything if the weights
+        changed; raises ValueError if the file was saved on a different scale.
+        """
+        state = cls(base_score, weights, min_score, max_score, city_of)
+        if not os.path.exists(path):
+            return state
+        with open(path, "r", encoding="utf-8") as f:
+            saved = json.load(f)
+        saved_config = saved.get("config") or {}
+        scale = ("base_score", "min_score", "max_score")
+        if saved_config and any(saved_config.get(k) != getattr(state, k) for k in scale):
+            raise ValueError(
+                f"{path} holds scores on another scale (base {saved_config.get('base_score')}, "
+                f"{saved_config.get('min_score')}-{saved_config.get('max_score')}); "
+                "use a separate state file for each script"
+            )
+        state.places = saved.get("places", {})
+        state.cities = saved.get("cities", {})
+        state.applied_batches = saved.get("applied_batches", [])
+        if saved.get("config") != state._config():
+            print("⚠️  Score weights or formula changed since last run; rescoring all places from counts")
+            state._rescore_all()
+        return state
+
+    def save(self, path: str):
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({
+                "config": self._config(),
+                "applied_batches": self.applied_batches,
+                "places": self.places,
+                "cities": self.cities,
+            }, f, indent=2, ensure_ascii=False)
+        os.replace(tmp, path)
+
+    def _config(self) -> Dict[str, Any]:
+        return {"version": STATE_VERSION, "base_score": self.base_score, "weights": self.weights,
+                "min_score": self.min_score, "max_score": self.max_score}
+
+    # --- scoring ---
+    def _score(self, raw: float) -> float:
+        return _clamp(self.base_score + raw, self.min_score, self.max_score)
+
+    def _city_score(self, info: Dict[str, Any]) -> float:
+        if not info["incidents"]:
+            return self._score(0)
+        return _clamp(info["raw"], self.min_score, self.max_score)
+
+    def place_score(self, name: str) -> float:
+        place = self.places.get(name)
+        return place["score"] if place else self._score(0)
+
+    def city_score(self, city: str) -> float:
+        info = self.cities.get(city)
+        return info["score"] if info else self._score(0)
+
+    def _rescore_all(self):
+        for name, place in self.places.items():
+            raw = sum(self.weights.get(cat, 0) * n for cat, n in place["counts"].items())
+            place["raw"] = raw
+            new = self._score(raw)
+            if new != place["score"]:
+                place["score"] = new
+                self._pending["places"][name] = new
+        for city, info in self.cities.items():
+            info["raw"] = sum(self.places[p]["raw"] for p in info["places"] if p in self.places)
+            new = self._city_score(info)
+            if new != info["score"]:
+                info["score"] = new
+                self._pending["cities"][city] = new
+
+    def apply_batch(self, locations: Dict[str, Any],
+                    batch_id: Optional[str] = None) -> Dict[str, Dict[str, float]]:
+        """
+        Add a batch of incidents ({place: {"incidents": [...], "positive_events": [...]}},
+        categories under "category" or "type"). Only places in the batch and
+        their cities are updated.
+
+        Returns {"places": {name: new_score}, "cities": {city: new_score}} for
+        scores that actually changed (new places always count as changed).
+        A batch_id that was already applied is skipped.
+        """
+        counts: Dict[str, Dict[str, int]] = {}
+        for name, data in locations.items():
+            items = list(data.get("incidents", [])) + list(data.get("positive_events", []))
+            for inc in items:
+                cat = inc.get("category") or inc.get("type") or ""
+                place_counts = counts.setdefault(name, {})
+                place_counts[cat] = place_counts.get(cat, 0) + 1
+        return self.apply_counts(counts, batch_id)
+
+    def apply_counts(self, counts: Dict[str, Dict[str, int]],
+                     batch_id: Optional[str] = None) -> Dict[str, Dict[str, float]]:
+        """
+        Same as `apply_batch`, for pre-aggregated {place: {category: n}} counts
+        (e.g. a group-by over the columnar export).
+        """
+        changes = self._pending
+        self._pending = {"places": {}, "cities": {}}
+        if batch_id is not None:
+            if batch_id in self.applied_batches:
+                print(f"⏭️  Batch {batch_id} already scored")
+                return changes
+            self.applied_batches.append(batch_id)
+
+        for name, place_counts in counts.items():
+            n_items = sum(place_counts.values())
+            if not n_items:
+                continue
+            place = self.places.get(name)
+            is_new = place is None
+            if is_new:
+                city = self.city_of(name) if self.city_of else None
+                place = {"counts": {}, "raw": 0.0, "incidents": 0, "score": self._score(0), "city": city}
+                self.places[name] = place
+            delta = 0.0
+            for cat, n in place_counts.items():
+                place["counts"][cat] = place["counts"].get(cat, 0) + n
+                delta += self.weights.get(cat, 0) * n
+            place["incidents"] += n_items
+            place["raw"] += delta
+            new = self._score(place["raw"])
+            if is_new or new != place["score"]:
+                changes["places"][name] = new
+            place["score"] = new
+
+            city = place["city"]
+            if city is None:
+                continue
+            city_is_new = city not in self.cities
+            info = self.cities.setdefault(city, {"raw": 0.0, "incidents": 0, "places": [],
+                                                 "score": self._score(0)})
+            if name not in info["places"]:
+                info["places"].append(name)
+            info["raw"] += delta
+            info["incidents"] += n_items
+            new_city = self._city_score(info)
+            if city_is_new or new_city != info["score"] or city in changes["cities"]:
+                changes["cities"][city] = new_city
+            info["score"] = new_city
+        return changes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Incremental place scores")
+    parser.add_argument("--state", default=DEFAULT_STATE_PATH)
+    parser.add_argument("--base", type=float, default=SAFETY_SCORE_BASE)
+    parser.add_argument("--min", type=float, default=0.0)
+    parser.add_argument("--max", type=float, default=100.0)
+    parser.add_argument("--weights", help="JSON object of category -> weight")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_apply = sub.add_parser("apply", help="score parsed JSON files")
+    p_apply.add_argument("files", nargs="+")
+    p_rebuild = sub.add_parser("rebuild", help="rebuild the state from the columnar export")
+    p_rebuild.add_argument("export_root", nargs="?", default=None)
+    sub.add_parser("show", help="print current place scores")
+    args = parser.parse_args()
+
+    weights = json.loads(args.weights) if args.weights else SAFETY_SCORE_WEIGHTS
+    state = ScoringState.load(args.state, args.base, weights, args.min, args.max)
+
+    if args.command == "apply":
+        for path in args.files:
+            with open(path, "r", encoding="utf-8") as f:
+                parsed = json.load(f)
+            locations = parsed["locations"] if isinstance(parsed.get("locations"), dict) else parsed
+            changes = state.apply_batch(locations, batch_id=edition_source(path))
+            print(f"📊 {path}: {len(changes['places'])} place score(s) changed")
+            for name, score in changes["places"].items():
+                print(f"  {name}: {score:.1f}")
+        state.save(args.state)
+    elif args.command == "rebuild":
+        # one vectorized group-by over the export instead of re-reading every JSON dump
+        from columnar_export import DEFAULT_EXPORT_DIR, counts_by_location, read_incidents
+        table = read_incidents(args.export_root or DEFAULT_EXPORT_DIR, ["source_pdf", "location", "category"])
+        state = ScoringState(args.base, weights, args.min, args.max)
+        state.apply_counts(counts_by_location(table))
+        state.applied_batches = sorted(set(table["source_pdf"].to_pylist()))
+        state.save(args.state)
+        print(f"✅ Rebuilt {len(state.places)} places from {table.num_rows} incidents")
+    else:
+        for name, place in sorted(state.places.items(), key=lambda kv: kv[1]["score"]):
+            print(f"{place['score']:6.1f}  {place['incidents']:4d} incidents  {name}")
+
+
+if __name__ == "__main__":
+    main()
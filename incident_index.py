@@ -0,0 +1,503 @@
+"""
+Incident Index
+--------------
+On-disk inverted index over extracted incidents, so questions like "all chain
+snatching incidents in Velachery last quarter" don't require loading every
+`*_parsed.json` dump.
+
+Each ingested edition becomes one immutable segment directory:
+
+    docs.jsonl    one incident record per line
+    docs.bin      per-doc (offset into docs.jsonl, date as yyyymmdd)
+    terms.str     sorted term bytes, concatenated
+    terms.bin     per-term (term offset, term length, postings offset, count)
+    postings.bin  uint32 doc ids per term, ascending
+
+Terms are lowercase words from the summary, text and location, plus facet
+terms `loc:<location>` and `cat:<category>`. Segments are memory-mapped and
+terms are found by binary search, so a query only touches the pages it needs.
+`manifest.json` lists the live segments; `compact` merges them into one.
+Adding an edition that is already indexed replaces its segment (a compacted
+segment is rewritten without it), so re-ingesting never duplicates incidents.
+
+Usage:
+    python incident_index.py add Report_parsed.json [--date 2025-11-14]
+    python incident_index.py query "chain snatching" --location velachery --since 2025-08-01
+    python incident_index.py compact
+    python incident_index.py stats
+"""
+
+import argparse
+import json
+import mmap
+import os
+import re
+import shutil
+import struct
+from datetime import date, datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+DEFAULT_INDEX_DIR = os.environ.get("INCIDENT_INDEX_DIR", "incident_index")
+
+DOC_STRUCT = struct.Struct("<QI")     # offset in docs.jsonl, yyyymmdd
+TERM_STRUCT = struct.Struct("<IIII")  # term offset, term length, postings offset (ids), count
+POSTING_SIZE = 4                      # uint32 doc id
+
+STOPWORDS = {
+    "the", "and", "for", "was", "were", "are", "with", "from", "that", "this",
+    "his", "her", "its", "has", "had", "have", "been", "into", "who", "which",
+    "after", "near", "over", "their", "they", "them", "said", "also", "not",
+}
+
+
+DATE_IN_NAME = [
+    (re.compile(r"(?<!\d)(\d{4})[-_.]?(\d{2})[-_.]?(\d{2})(?!\d)"), (1, 2, 3)),  # 2025-11-14, 20251114
+    (re.compile(r"(?<!\d)(\d{2})[-_.](\d{2})[-_.](\d{4})(?!\d)"), (3, 2, 1)),    # 14-11-2025
+]
+
+
+# --- Edition identity ---
+def edition_source(path: str) -> str:
+    """
+    Source key of an edition, the same for the edition file and its parsed
+    JSON ("Report.pdf" and "Report_parsed.json" are both "Report"), so every
+    path that adds an edition replaces the same entry.
+    """
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return re.sub(r"_parsed$", "", stem)
+
+
+def parse_edition_date(value: str) -> str:
+    """Validate an edition date; returns it as YYYY-MM-DD or raises ValueError."""
+    try:
+        return date.fromisoformat(value.strip()).isoformat()
+    except (AttributeError, ValueError):
+        raise ValueError(f"invalid edition date {value!r}, expected YYYY-MM-DD") from None
+
+
+def edition_date_from_path(path: str, use_mtime: bool = False) -> Optional[str]:
+    """
+    Edition date (YYYY-MM-DD) from a date in the file name; with `use_mtime`,
+    fall back to the file's modification day, which stays the same however
+    often the file is re-ingested.
+    """
+    name = os.path.basename(path)
+    for pattern, (y, m, d) in DATE_IN_NAME:
+        for match in pattern.finditer(name):
+            try:
+                return date(int(match.group(y)), int(match.group(m)), int(match.group(d))).isoformat()
+            except ValueError:
+                continue
+    if use_mtime and os.path.exists(path):
+        return date.fromtimestamp(os.path.getmtime(path)).isoformat()
+    return None
+
+
+# --- Normalizing parsed output into flat incident records ---
+def _coords(value) -> Tuple[Optional[float], Optional[float]]:
+    if isinstance(value, dict):
+        return value.get("lat"), value.get("lng")
+    if isinstance(value, (list, tuple)) and len(value) == 2:
+        return value[0], value[1]
+    return None, None
+
+
+def iter_incident_records(parsed: Dict[str, Any], source: str,
+                          edition_date: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Flatten either parsed shape into one record per incident:
+    `ingest_to_supabase.py` ({place: {coordinates, incidents}}) or
+    `main.py` ({"locations": {place: {coordinates, incidents}}, ...}).
+
+    The record date is `edition_date` if given, else the incident's own
+    edition_date (set by `ingest_to_supabase.py`), else its extracted_at
+    day, else today.
+    """
+    locations = parsed.get("locations") if isinstance(parsed.get("locations"), dict) else parsed
+    for place, data in locations.items():
+        if not isinstance(data, dict):
+            continue
+        lat, lng = _coords(data.get("coordinates"))
+        for inc in data.get("incidents", []):
+            extracted_at = inc.get("extracted_at")
+            day = (edition_date or inc.get("edition_date") or (extracted_at or "")[:10]
+                   or date.today().isoformat())
+            yield {
+                "source": source,
+                "page": inc.get("page"),
+                "location": place,
+                "lat": lat,
+                "lng": lng,
+                "category": inc.get("category") or inc.get("type") or "",
+                "summary": inc.get("summary") or inc.get("description") or "",
+                "text": inc.get("full_text") or inc.get("original_text") or "",
+                "date": day,
+                "extracted_at": extracted_at,
+            }
+
+
+# --- Terms ---
+def tokenize(text: str) -> List[str]:
+    return [t for t in re.findall(r"[a-z0-9]+", text.lower())
+            if len(t) > 1 and t not in STOPWORDS]
+
+
+def location_facet(location: str) -> str:
+    return "loc:" + " ".join(re.findall(r"[a-z0-9]+", location.lower()))
+
+
+def category_facet(category: str) -> str:
+    return "cat:" + category.strip().lower()
+
+
+def record_terms(record: Dict[str, Any]) -> set:
+    terms = set(tokenize(" ".join([record["location"], record["summary"], record["text"]])))
+    terms.add(location_facet(record["location"]))
+    if record["category"]:
+        terms.add(category_facet(record["category"]))
+    return terms
+
+
+def _date_key(day: Optional[str]) -> int:
+    """'2025-11-14' -> 20251114 (0 if missing)."""
+    if not day:
+        return 0
+    return int(datetime.strptime(day[:10], "%Y-%m-%d").strftime("%Y%m%d"))
+
+
+# --- Segments ---
+def write_segment(path: str, records: List[Dict[str, Any]]):
+    """Write records as one immutable segment directory (atomically renamed into place)."""
+    tmp = path + ".tmp"
+    if os.path.exists(tmp):
+        shutil.rmtree(tmp)
+    os.makedirs(tmp)
+
+    postings: Dict[str, List[int]] = {}
+    with open(os.path.join(tmp, "docs.jsonl"), "wb") as docs, \
+         open(os.path.join(tmp, "docs.bin"), "wb") as doc_idx:
+        for doc_id, rec in enumerate(records):
+            doc_idx.write(DOC_STRUCT.pack(docs.tell(), _date_key(rec.get("date"))))
+            docs.write(json.dumps(rec, ensure_ascii=False).encode("utf-8") + b"\n")
+            for term in record_terms(rec):
+                postings.setdefault(term, []).append(doc_id)
+
+    with open(os.path.join(tmp, "terms.str"), "wb") as term_str, \
+         open(os.path.join(tmp, "terms.bin"), "wb") as term_idx, \
+         open(os.path.join(tmp, "postings.bin"), "wb") as post:
+        post_off = 0
+        for term in sorted(postings, key=lambda t: t.encode("utf-8")):
+            raw = term.encode("utf-8")
+            ids = postings[term]
+            term_idx.write(TERM_STRUCT.pack(term_str.tell(), len(raw), post_off, len(ids)))
+            term_str.write(raw)
+            post.write(struct.pack(f"<{len(ids)}I", *ids))
+            post_off += len(ids)
+
+    os.replace(tmp, path)
+
+
+def _mmap_file(path: str) -> Optional[mmap.mmap]:
+    if os.path.getsize(path) == 0:
+        return None  # empty files can't be mapped
+    with open(path, "rb") as f:
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+class Segment:
+    """Read-only, memory-mapped view of one segment directory."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._docs = _mmap_file(os.path.join(path, "docs.jsonl"))
+        self._doc_idx = _mmap_file(os.path.join(path, "docs.bin"))
+        self._term_str = _mmap_file(os.path.join(path, "terms.str"))
+        self._term_idx = _mmap_file(os.path.join(path, "terms.bin"))
+        self._postings = _mmap_file(os.path.join(path, "postings.bin"))
+        self.doc_count = len(self._doc_idx) // DOC_STRUCT.size if self._doc_idx else 0
+        self.term_count = len(self._term_idx) // TERM_STRUCT.size if self._term_idx else 0
+
+    def close(self):
+        for mm in (self._docs, self._doc_idx, self._term_str, self._term_idx, self._postings):
+            if mm is not None:
+                mm.close()
+
+    def _term_at(self, i: int) -> Tuple[bytes, int, int]:
+        t_off, t_len, p_off, count = TERM_STRUCT.unpack_from(self._term_idx, i * TERM_STRUCT.size)
+        return self._term_str[t_off:t_off + t_len], p_off, count
+
+    def _lower_bound(self, key: bytes) -> int:
+        lo, hi = 0, self.term_count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._term_at(mid)[0] < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _ids(self, p_off: int, count: int) -> List[int]:
+        return list(struct.unpack_from(f"<{count}I", self._postings, p_off * POSTING_SIZE))
+
+    def postings(self, term: str) -> List[int]:
+        """Doc ids containing exactly `term`."""
+        key = term.encode("utf-8")
+        i = self._lower_bound(key)
+        if i < self.term_count:
+            found, p_off, count = self._term_at(i)
+            if found == key:
+                return self._ids(p_off, count)
+        return []
+
+    def prefix_postings(self, prefix: str, whole_words: bool = False) -> List[int]:
+        """
+        Doc ids containing any term that starts with `prefix`. With
+        `whole_words`, the prefix must end at a word boundary of the term
+        ("loc:velachery" matches "loc:velachery main road", not "loc:velacheryx").
+        """
+        key = prefix.encode("utf-8")
+        ids = set()
+        i = self._lower_bound(key)
+        while i < self.term_count:
+            found, p_off, count = self._term_at(i)
+            if not found.startswith(key):
+                break
+            if not whole_words or len(found) == len(key) or found[len(key):len(key) + 1] == b" ":
+                ids.update(self._ids(p_off, count))
+            i += 1
+        return sorted(ids)
+
+    def doc_date(self, doc_id: int) -> int:
+        return DOC_STRUCT.unpack_from(self._doc_idx, doc_id * DOC_STRUCT.size)[1]
+
+    def doc(self, doc_id: int) -> Dict[str, Any]:
+        offset, _ = DOC_STRUCT.unpack_from(self._doc_idx, doc_id * DOC_STRUCT.size)
+        end = self._docs.find(b"\n", offset)
+        return json.loads(self._docs[offset:end if end != -1 else None])
+
+    def iter_docs(self) -> Iterator[Dict[str, Any]]:
+        for doc_id in range(self.doc_count):
+            yield self.doc(doc_id)
+
+
+# --- Index ---
+class IncidentIndex:
+    """A directory of segments plus a manifest of which sources each holds."""
+
+    def __init__(self, root: str = DEFAULT_INDEX_DIR):
+        self.root = root
+        self._manifest_path = os.path.join(root, "manifest.json")
+        self._segments: Dict[str, Segment] = {}
+        if os.path.exists(self._manifest_path):
+            with open(self._manifest_path, "r", encoding="utf-8") as f:
+                self.manifest = json.load(f)
+        else:
+            self.manifest = {"next_segment": 1, "segments": [], "sources": {}}
+
+    def close(self):
+        for seg in self._segments.values():
+            seg.close()
+        self._segments = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _save_manifest(self):
+        os.makedirs(self.root, exist_ok=True)
+        tmp = self._manifest_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f, indent=2)
+        os.replace(tmp, self._manifest_path)
+
+    def _segment(self, name: str) -> Segment:
+        if name not in self._segments:
+            self._segments[name] = Segment(os.path.join(self.root, name))
+        return self._segments[name]
+
+    def _new_segment_name(self) -> str:
+        name = f"seg-{self.manifest['next_segment']:06d}"
+        self.manifest["next_segment"] += 1
+        return name
+
+    def has_source(self, source: str) -> bool:
+        return source in self.manifest["sources"]
+
+    def add(self, parsed: Dict[str, Any], source: str, edition_date: Optional[str] = None) -> int:
+        """
+        Index one parsed edition as a new segment, replacing whatever was
+        indexed for `source` before. Returns the number of incidents added.
+        """
+        if edition_date is not None:
+            edition_date = parse_edition_date(edition_date)
+        records = list(iter_incident_records(parsed, source, edition_date))
+        os.makedirs(self.root, exist_ok=True)
+        removed = self._drop_source(source) if self.has_source(source) else []
+        if records:
+            name = self._new_segment_name()
+            write_segment(os.path.join(self.root, name), records)
+            self.manifest["segments"].append(name)
+            self.manifest["sources"][source] = name
+        if records or removed:
+            self._save_manifest()
+        for name in removed:
+            shutil.rmtree(os.path.join(self.root, name), ignore_errors=True)
+        return len(records)
+
+    def _drop_source(self, source: str) -> List[str]:
+        """
+        Take `source` out of the manifest (not saved yet). A segment shared
+        with other sources (after `compact`) is rewritten without it. Returns
+        the segment directories to delete once the manifest is saved.
+        """
+        name = self.manifest["sources"].pop(source)
+        others = [s for s, seg in self.manifest["sources"].items() if seg == name]
+        pos = self.manifest["segments"].index(name)
+        if others:
+            keep = [doc for doc in self._segment(name).iter_docs() if doc["source"] != source]
+            rewritten = self._new_segment_name()
+            write_segment(os.path.join(self.root, rewritten), keep)
+            self.manifest["segments"][pos] = rewritten
+            for s in others:
+                self.manifest["sources"][s] = rewritten
+        else:
+            del self.manifest["segments"][pos]
+        seg = self._segments.pop(name, None)
+        if seg is not None:
+            seg.close()
+        return [name]
+
+    def search(self, query: str = "", location: Optional[str] = None,
+               category: Optional[str] = None, since: Optional[str] = None,
+               until: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+        """
+        Incidents matching every keyword in `query`, a location prefix and a
+        category, within [since, until] (ISO dates). Newest first.
+        """
+        words = tokenize(query)
+        lo = _date_key(since) if since else 0
+        hi = _date_key(until) if until else 99999999
+        hits: List[Tuple[int, str, int]] = []
+        for name in self.manifest["segments"]:
+            seg = self._segment(name)
+            lists = [seg.postings(w) for w in words]
+            if location:
+                lists.append(seg.prefix_postings(location_facet(location), whole_words=True))
+            if category:
+                lists.append(seg.postings(category_facet(category)))
+            if lists:
+                lists.sort(key=len)
+                ids = set(lists[0])
+                for other in lists[1:]:
+                    if not ids:
+                        break
+                    ids.intersection_update(other)
+            else:
+                ids = set(range(seg.doc_count))
+            for doc_id in ids:
+                day = seg.doc_date(doc_id)
+                if lo <= day <= hi:
+                    hits.append((day, name, doc_id))
+        hits.sort(key=lambda h: (h[0], h[1], h[2]), reverse=True)
+        return [self._segment(name).doc(doc_id) for _, name, doc_id in hits[:limit]]
+
+    def compact(self) -> int:
+        """Merge all segments into one. Returns the number of segments merged."""
+        old = list(self.manifest["segments"])
+        if len(old) < 2:
+            return 0
+        records = []
+        for name in old:
+            records.extend(self._segment(name).iter_docs())
+        self.close()
+        merged = self._new_segment_name()
+        write_segment(os.path.join(self.root, merged), records)
+        self.manifest["segments"] = [merged]
+        self.manifest["sources"] = {s: merged for s in self.manifest["sources"]}
+        self._save_manifest()
+        for name in old:
+            shutil.rmtree(os.path.join(self.root, name), ignore_errors=True)
+        return len(old)
+
+    def stats(self) -> Dict[str, int]:
+        docs = terms = 0
+        for name in self.manifest["segments"]:
+            seg = self._segment(name)
+            docs += seg.doc_count
+            terms += seg.term_count
+        return {"segments": len(self.manifest["segments"]), "sources": len(self.manifest["sources"]),
+                "incidents": docs, "terms": terms}
+
+
+def index_parsed_file(json_path: str, index_dir: str = DEFAULT_INDEX_DIR,
+                      edition_date: Optional[str] = None, source: Optional[str] = None) -> int:
+    """
+    Add one `*_parsed.json` (or main.py output) file to the index. The source
+    defaults to `edition_source(json_path)` and the date to one in the file
+    name.
+    """
+    with open(json_path, "r", encoding="utf-8") as f:
+        parsed = json.load(f)
+    with IncidentIndex(index_dir) as index:
+        return index.add(parsed, source or edition_source(json_path),
+                         edition_date or edition_date_from_path(json_path))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Incident inverted index")
+    parser.add_argument("--index", default=DEFAULT_INDEX_DIR, help="index directory")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_add = sub.add_parser("add", help="index parsed JSON files")
+    p_add.add_argument("files", nargs="+")
+    p_add.add_argument("--date", help="edition date (YYYY-MM-DD) for all files")
+    p_add.add_argument("--source", help="source key (single file; default: file name without _parsed)")
+
+    p_query = sub.add_parser("query", help="search incidents")
+    p_query.add_argument("text", nargs="?", default="")
+    p_query.add_argument("--location")
+    p_query.add_argument("--category")
+    p_query.add_argument("--since", help="YYYY-MM-DD")
+    p_query.add_argument("--until", help="YYYY-MM-DD")
+    p_query.add_argument("--limit", type=int, default=20)
+    p_query.add_argument("--json", action="store_true", help="print raw records")
+
+    sub.add_parser("compact", help="merge all segments into one")
+    sub.add_parser("stats", help="show index size")
+    args = parser.parse_args()
+
+    try:
+        for field in ("date", "since", "until"):
+            if getattr(args, field, None):
+                setattr(args, field, parse_edition_date(getattr(args, field)))
+    except ValueError as e:
+        parser.error(str(e))
+
+    if args.command == "add":
+        if args.source and len(args.files) > 1:
+            parser.error("--source needs a single file")
+        for path in args.files:
+            added = index_parsed_file(path, args.index, args.date, args.source)
+            print(f"✅ {path}: {added} incidents indexed")
+        return
+
+    with IncidentIndex(args.index) as index:
+        if args.command == "compact":
+            print(f"✅ Merged {index.compact()} segments")
+        elif args.command == "stats":
+            print(json.dumps(index.stats(), indent=2))
+        else:
+            results = index.search(args.text, args.location, args.category,
+                                   args.since, args.until, args.limit)
+            if args.json:
+                print(json.dumps(results, indent=2, ensure_ascii=False))
+                return
+            for rec in results:
+                print(f"{rec['date']}  {rec['category']:<18} {rec['location']:<20} {rec['summary'][:80]}")
+            print(f"\n{len(results)} result(s)")
+
+
+if __name__ == "__main__":
+    main()
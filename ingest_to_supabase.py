@@ -4,7 +4,10 @@ PDF to Supabase Data Ingestion Script
 Extracts crime and safety data from PDF newspapers and ingests into Supabase.
 
 Usage:
-    python ingest_to_supabase.py path/to/newspaper.pdf
+    python ingest_to_supabase.py path/to/newspaper.pdf [YYYY-MM-DD]
+
+The edition date defaults to a date in the file name, else the file's
+modification day.
 """
 
 import sys
@@ -16,15 +19,20 @@ import subprocess
 import re
 
 # Install dependencies if needed
+# (PDF libraries are imported by the extraction backend in pdf_extract.py)
 try:
-    import pdfplumber
     from supabase import create_client, Client
 except ImportError:
     print("📦 Installing required packages...")
-    subprocess.check_call([sys.executable, "-m", "pip", "install", "pdfplumber", "supabase"])
-    import pdfplumber
+    subprocess.check_call([sys.executable, "-m", "pip", "install", "supabase"])
     from supabase import create_client, Client
 
+from pdf_extract import extract_paragraphs_with_pages
+from incident_index import (DEFAULT_INDEX_DIR, edition_date_from_path, edition_source, index_parsed_file,
+                            parse_edition_date)
+from delta_scoring import DEFAULT_STATE_PATH, SAFETY_SCORE_BASE, SAFETY_SCORE_WEIGHTS, ScoringState
+from review_stats import incident_reviews
+
 # Supabase configuration
 SUPABASE_URL = os.environ.get("SUPABASE_URL")
 SUPABASE_KEY = os.environ.get("SUPABASE_KEY")
@@ -61,21 +69,12 @@ CRIME_KEYWORDS = {
     "safety": ["police", "arrest", "raid", "security", "patrol", "safety measure", "cctv"]
 }
 
-def extract_text_from_pdf(pdf_path: str) -> List[str]:
-    """Extract paragraphs from PDF."""
-    paragraphs = []
+def extract_text_from_pdf(pdf_path: str, backend: Optional[str] = None) -> List[tuple]:
+    """Extract (page_number, paragraph) pairs from PDF."""
     print(f"📄 Reading PDF: {pdf_path}")
     
-    with pdfplumber.open(pdf_path) as pdf:
-        for page_num, page in enumerate(pdf.pages, 1):
-            text = page.extract_text()
-            if text:
-                # Split into paragraphs
-                chunks = text.split('\n\n')
-                for chunk in chunks:
-                    clean = chunk.strip().replace('\n', ' ')
-                    if len(clean) > 50:  # Minimum paragraph length
-                        paragraphs.append(clean)
+    # Minimum paragraph length of 50 chars drops headlines and captions
+    paragraphs = extract_paragraphs_with_pages(pdf_path, backend=backend, min_chars=50)
     
     print(f"✅ Extracted {len(paragraphs)} paragraphs")
     return paragraphs
@@ -117,33 +116,14 @@ def extract_location(text: str) -> Optional[tuple]:
     
     return None, None
 
-def calculate_safety_score(incidents: List[Dict]) -> float:
-    """Calculate safety score based on incidents (0-100 scale)."""
-    base_score = 100.0
-    
-    for incident in incidents:
-        category = incident.get("category", "other")
-        if category == "violent_crime":
-            base_score -= 15
-        elif category == "property_crime":
-            base_score -= 10
-        elif category == "accident":
-            base_score -= 8
-        elif category == "public_disturbance":
-            base_score -= 5
-        elif category == "safety_measure":
-            base_score += 5
-    
-    return max(0, min(100, base_score))
-
-def parse_pdf(pdf_path: str) -> Dict[str, Any]:
+def parse_pdf(pdf_path: str, edition_date: Optional[str] = None) -> Dict[str, Any]:
     """Parse PDF and extract structured data."""
     paragraphs = extract_text_from_pdf(pdf_path)
     
     locations_data = {}
     
     print(f"\n🔍 Analyzing content...")
-    for para in paragraphs:
+    for page, para in paragraphs:
         # Check if paragraph is relevant
         if not any(kw in para.lower() for keywords in CRIME_KEYWORDS.values() for kw in keywords):
             continue
@@ -168,6 +148,8 @@ def parse_pdf(pdf_path: str) -> Dict[str, Any]:
             "category": category,
             "summary": para[:200],  # First 200 chars
             "full_text": para,
+            "page": page,
+            "edition_date": edition_date,
             "extracted_at": datetime.utcnow().isoformat()
         })
     
@@ -175,8 +157,8 @@ def parse_pdf(pdf_path: str) -> Dict[str, Any]:
     return locations_data
 
 def upsert_place(name: str, lat: Optional[float], lng: Optional[float], 
-                 safety_score: float) -> Optional[str]:
-    """Insert or update place in database."""
+                 safety_score: float, score_changed: bool = True) -> Optional[str]:
+    """Insert or update place in database (existing places are only updated if the score changed)."""
     if not lat or not lng:
         print(f"⚠️  Skipping {name} - no coordinates")
         return None
@@ -186,6 +168,9 @@ def upsert_place(name: str, lat: Optional[float], lng: Optional[float],
     
     if existing.data:
         place_id = existing.data[0]["id"]
+        if not score_changed:
+            print(f"  ➖ Unchanged: {name} (score: {safety_score:.1f})")
+            return place_id
         supabase.table("places").update({
             "safety_score": safety_score,
             "updated_at": datetime.utcnow().isoformat(),
@@ -206,6 +191,16 @@ def upsert_place(name: str, lat: Optional[float], lng: Optional[float],
     
     return place_id
 
+def update_place_scores(scores: Dict[str, float]):
+    """Write rescored places that are not part of the current batch (e.g. after a weight change)."""
+    for name, safety_score in scores.items():
+        result = supabase.table("places").update({
+            "safety_score": safety_score,
+            "updated_at": datetime.utcnow().isoformat(),
+        }).eq("name", name).execute()
+        if result.data:
+            print(f"  ✅ Rescored: {name} (score: {safety_score:.1f})")
+
 def insert_safety_attributes(place_id: str, incidents: List[Dict]):
     """Insert safety attributes for place."""
     violent = len([i for i in incidents if i["category"] == "violent_crime"])
@@ -226,34 +221,28 @@ def insert_safety_attributes(place_id: str, incidents: List[Dict]):
         "data_timestamp": datetime.utcnow().isoformat(),
     }).execute()
 
-def insert_reviews(place_id: str, incidents: List[Dict]):
-    """Insert incidents as reviews."""
-    for incident in incidents[:3]:  # Top 3 incidents
-        category = incident["category"]
-        
-        # Map category to rating
-        rating_map = {
-            "violent_crime": 1,
-            "property_crime": 2,
-            "accident": 2,
-            "public_disturbance": 3,
-            "safety_measure": 5
-        }
-        rating = rating_map.get(category, 3)
-        
-        supabase.table("place_reviews").insert({
-            "place_id": place_id,
-            "safety_rating": rating,
-            "overall_rating": rating,
-            "review_text": f"[PDF] {incident['summary']}",
-            "tags": [category, "pdf_extract"],
-            "is_verified": True,
-        }).execute()
+def insert_reviews(reviews: List[Dict[str, Any]]):
+    """
+    Insert a batch's incident reviews in one request. Triggers on place_reviews
+    merge them into place_review_stats within the same statement.
+    """
+    if not reviews:
+        return
+    supabase.table("place_reviews").insert(reviews).execute()
+    print(f"  📝 {len(reviews)} review(s) added for {len({r['place_id'] for r in reviews})} place(s)")
 
-def ingest_to_supabase(locations_data: Dict[str, Any]):
+def ingest_to_supabase(locations_data: Dict[str, Any], batch_id: Optional[str] = None):
     """Ingest parsed data into Supabase."""
     print(f"\n🚀 Ingesting data to Supabase...\n")
     
+    # Running per-place totals: only places mentioned in this batch are rescored,
+    # and only scores that actually changed are written
+    state = ScoringState.load(DEFAULT_STATE_PATH, SAFETY_SCORE_BASE, SAFETY_SCORE_WEIGHTS, 0, 100)
+    # a re-ingested batch would add its attributes and reviews (and their stats) twice
+    already_ingested = batch_id is not None and batch_id in state.applied_batches
+    changes = state.apply_batch(locations_data, batch_id)
+    reviews = []
+    
     for location_name, data in locations_data.items():
         coords = data.get("coordinates")
         incidents = data.get("incidents", [])
@@ -262,27 +251,43 @@ def ingest_to_supabase(locations_data: Dict[str, Any]):
             print(f"⏭️  Skipping {location_name} - no coordinates")
             continue
         
-        # Calculate safety score
-        safety_score = calculate_safety_score(incidents)
+        # Cumulative safety score across all ingested editions
+        safety_score = state.place_score(location_name)
         
         # Insert place
-        place_id = upsert_place(location_name, coords[0], coords[1], safety_score)
+        place_id = upsert_place(location_name, coords[0], coords[1], safety_score,
+                                score_changed=location_name in changes["places"])
         if not place_id:
             continue
         
+        if already_ingested:
+            continue
+        
         # Insert attributes
         insert_safety_attributes(place_id, incidents)
         
-        # Insert reviews
-        insert_reviews(place_id, incidents)
+        # Collect reviews for one bulk insert
+        reviews.extend(incident_reviews(place_id, incidents))
+    
+    # Scores that changed for places outside this batch (a weight change rescores everything)
+    others = {name: score for name, score in changes["places"].items() if name not in locations_data}
+    if others:
+        print(f"\n🔁 Writing {len(others)} rescored place(s) from earlier editions")
+        update_place_scores(others)
+    
+    if already_ingested:
+        print("⏭️  Attributes and reviews for this batch were already ingested")
+    else:
+        insert_reviews(reviews)
     
-    print(f"\n✅ Ingestion complete!")
+    state.save(DEFAULT_STATE_PATH)
+    print(f"\n✅ Ingestion complete! ({len(changes['places'])} place score(s) changed)")
     print(f"🔗 View at: {SUPABASE_URL}/project/default/editor")
 
 def main():
     """Main entry point."""
     if len(sys.argv) < 2:
-        print("Usage: python ingest_to_supabase.py path/to/file.pdf")
+        print("Usage: python ingest_to_supabase.py path/to/file.pdf [YYYY-MM-DD]")
         sys.exit(1)
     
     pdf_path = sys.argv[1]
@@ -291,8 +296,18 @@ def main():
         print(f"❌ File not found: {pdf_path}")
         sys.exit(1)
     
+    # Edition identity: one key and date per edition, however often it is re-ingested
+    source = edition_source(pdf_path)
+    edition_date = sys.argv[2] if len(sys.argv) > 2 else edition_date_from_path(pdf_path, use_mtime=True)
+    try:
+        edition_date = parse_edition_date(edition_date)
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    print(f"🗞️  Edition {source} ({edition_date})")
+    
     # Parse PDF
-    locations_data = parse_pdf(pdf_path)
+    locations_data = parse_pdf(pdf_path, edition_date)
     
     if not locations_data:
         print("❌ No relevant data found in PDF")
@@ -304,8 +319,21 @@ def main():
         json.dump(locations_data, f, indent=2, ensure_ascii=False)
     print(f"💾 Saved to: {output_json}")
     
+    # Add to the local incident index (query with incident_index.py)
+    indexed = index_parsed_file(output_json, edition_date=edition_date, source=source)
+    print(f"🗂️  Indexed {indexed} incidents in {DEFAULT_INDEX_DIR}")
+    
+    # Append to the columnar (Arrow/Parquet) export for analytics
+    try:
+        from columnar_export import DEFAULT_EXPORT_DIR, export_incidents
+    except ImportError:
+        print("⚠️  pyarrow not installed - skipping columnar export (pip install pyarrow)")
+    else:
+        exported = export_incidents(locations_data, source=source, edition_date=edition_date)
+        print(f"📊 Exported {exported} incidents to {DEFAULT_EXPORT_DIR}")
+    
     # Ingest to Supabase
-    ingest_to_supabase(locations_data)
+    ingest_to_supabase(locations_data, batch_id=source)
 
 if __name__ == "__main__":
     main()
@@ -1,9 +1,11 @@
 # pdf_safety_extract.py
-# Requirements: google-genai, pdfplumber, pydantic
+# Requirements: google-genai, pdfplumber, pydantic (see pdf_extract.py for optional backends)
 from google import genai
 from pydantic import BaseModel, Field
 from typing import List, Dict, Optional
-import pdfplumber
+from pdf_extract import extract_paragraphs
+from delta_scoring import ScoringState
+from incident_index import edition_source
 import os
 import math
 import json
@@ -38,6 +40,18 @@ class RootOutput(BaseModel):
     algorithm_used: AlgorithmUsed
     summary: str
 
+# --- Compact response models: the model cites paragraph ids instead of echoing text ---
+class CompactEntry(BaseModel):
+    para_id: int = Field(description="id n of the ===PARA n=== block the entry comes from")
+    type: str = Field(description="violent_crime / property_crime / public_disturbance / accident / police_action / safety_measure")
+    description: str = Field(description="1-2 sentence summary")
+
+class CompactLocation(BaseModel):
+    entries: List[CompactEntry] = Field(default_factory=list)
+
+class CompactOutput(BaseModel):
+    locations: Dict[str, CompactLocation]
+
 # --- Local scoring function (applies the exact algorithm you specified) ---
 BASE_SCORE = 10
 CRIME_PENALTIES = {
@@ -75,22 +89,47 @@ def get_coordinates_for_place(place_name: str):
     # fallback: no known coordinates
     return {"lat": None, "lng": None}
 
+def known_places(paragraph):
+    # Places from COORDINATE_LOOKUP named in the paragraph; a city only counts
+    # when no place inside it is named
+    low = paragraph.lower()
+    found = []
+    for key in COORDINATE_LOOKUP:
+        name = key.replace("-", " ").title()
+        if name not in found and re.search(r"\b" + re.escape(key) + r"\b", low):
+            found.append(name)
+    specific = [name for name in found if name != detect_city(name)]
+    return specific or found
+
+def classified_locations(items):
+    # {place: {"incidents", "positive_events"}} for (paragraph, category, places) items
+    out = {}
+    for para, cat, places in items:
+        bucket = "positive_events" if cat in POSITIVE_ADDITIONS else "incidents"
+        for place in places:
+            out.setdefault(place, {"incidents": [], "positive_events": []})[bucket].append({
+                "type": cat,
+                "description": para.split('\n')[0][:200],
+                "original_text": para
+            })
+    return out
+
+# heuristics: if a place name mentions a known city keyword, assign it; otherwise Unknown
+def detect_city(place_name: str):
+    if not place_name:
+        return "Unknown"
+    low = place_name.lower()
+    # basic detection for now
+    if "chennai" in low or any(k in low for k in ["anna nagar","t nagar","velachery","mylapore","tambaram"]):
+        return "Chennai"
+    return "Unknown"
+
 def aggregate_city_scores(output_locations: dict):
     """
     Aggregate per-city scores based on the incidents in `output_locations`.
     Returns a dict: city -> {coordinates, score, incidents_count, locations}
     """
     cities = {}
-    # heuristics: if a place name mentions a known city keyword, assign it; otherwise Unknown
-    def detect_city(place_name: str):
-        if not place_name:
-            return "Unknown"
-        low = place_name.lower()
-        # basic detection for now
-        if "chennai" in low or any(k in low for k in ["anna nagar","t nagar","velachery","mylapore","tambaram"]):
-            return "Chennai"
-        return "Unknown"
-
     for place, pdata in output_locations.items():
         city = detect_city(place)
         if city not in cities:
@@ -162,22 +201,47 @@ def compute_scores(locations_dict):
         }
     return result
 
+def build_output_locations(scored):
+    # Build output in the user-requested structure:
+    # {
+    #   "locations": {
+    #     "LocationName": {
+    #       "coordinates": {"lat": 0, "lng": 0},
+    #       "incidents": [ {"category":..., "summary":..., "original_text":...} ]
+    #     }
+    #   }
+    # }
+    out = {}
+    for loc, data in scored.items():
+        incidents_out = []
+        # include model-detected incidents
+        for inc in data.get("incidents", []):
+            incidents_out.append({
+                "category": inc.get("type"),
+                "summary": inc.get("description"),
+                "original_text": inc.get("original_text")
+            })
+        # include positive events as incidents as well (user schema uses single incidents list)
+        for pos in data.get("positive_events", []):
+            incidents_out.append({
+                "category": pos.get("type"),
+                "summary": pos.get("description"),
+                "original_text": pos.get("original_text")
+            })
+
+        coords = get_coordinates_for_place(loc)
+        out[loc] = {
+            "coordinates": coords,
+            "incidents": incidents_out,
+            "score_before_clamp": data.get("score_before_clamp"),
+            "final_score_10_scale": data.get("final_score_10_scale")
+        }
+    return out
+
 # --- PDF text extraction utility ---
-def extract_paragraphs_from_pdf(pdf_path):
-    paragraphs = []
-    with pdfplumber.open(pdf_path) as pdf:
-        for page in pdf.pages:
-            text = page.extract_text()
-            if not text:
-                continue
-            # Normalize line breaks and split into paragraphs by two newlines or long breaks
-            text = text.replace("\r", "\n")
-            parts = [p.strip() for p in text.split("\n\n") if p.strip()]
-            # further split long lines that look like multiple sentences glued together
-            for p in parts:
-                # split on sentence boundaries if necessary, but keep as paragraphs
-                paragraphs.append(" ".join(p.splitlines()))
-    return paragraphs
+def extract_paragraphs_from_pdf(pdf_path, backend: Optional[str] = None):
+    # Backend selection and column-aware segmentation live in pdf_extract.py
+    return extract_paragraphs(pdf_path, backend=backend)
 
 # --- Simple keyword filter for relevant paragraphs (adjust keywords as needed) ---
 RELEVANT_KEYWORDS = [
@@ -194,6 +258,79 @@ def is_relevant(paragraph):
             return True
     return False
 
+# --- Local fallback: deterministic extraction and classification ---
+def local_fallback_process_chunk(paragraphs):
+    # Heuristic location detection and keyword classification
+    place_suffixes = ["Nagar", "Tambaram", "Mylapore", "Velachery", "T Nagar", "T-Nagar", "Anna Nagar", "Road", "Street", "Colony", "Chennai", "Station"]
+    violent_kw = ["murder", "kill", "stabbing", "shooting", "assault", "clash", "riot"]
+    property_kw = ["robbery", "theft", "pickpocket", "snatch", "chain snatch", "burglary", "steal"]
+    accident_kw = ["accident", "crash", "collision", "derail", "train", "fatality", "killed", "injured"]
+    disturbance_kw = ["protest", "riot", "disturbance", "clash"]
+    police_kw = ["arrest", "police", "raid", "crackdown", "seized"]
+    safety_kw = ["safety", "evacuate", "precaution", "announced", "caution", "rescue", "operation"]
+
+    out = {}
+    for para in paragraphs:
+        low = para.lower()
+        # find candidate locations by suffixes
+        found_locs = []
+        for suf in place_suffixes:
+            if suf.lower() in low:
+                # find the full token(s) containing the suffix
+                matches = re.findall(r"([A-Z][A-Za-z0-9\- ]+" + re.escape(suf) + r")", para)
+                for m in matches:
+                    m = m.strip()
+                    if m not in found_locs:
+                        found_locs.append(m)
+        # fallback: look for proper nouns of 2 words (e.g., 'T Nagar', 'Anna Nagar')
+        if not found_locs:
+            pn = re.findall(r"\b([A-Z][a-z]+(?:\s[A-Z][a-z]+){0,2})\b", para)
+            # filter common non-place words
+            for cand in pn:
+                if len(cand) > 2 and not cand.lower().startswith("police") and not cand.lower().startswith("the"):
+                    found_locs.append(cand)
+        if not found_locs:
+            found_locs = ["Unknown"]
+
+        # classify
+        cat = None
+        if any(k in low for k in violent_kw):
+            cat = "violent_crime"
+        elif any(k in low for k in property_kw):
+            cat = "property_crime"
+        elif any(k in low for k in accident_kw):
+            cat = "accident"
+        elif any(k in low for k in disturbance_kw):
+            cat = "public_disturbance"
+        elif any(k in low for k in police_kw):
+            # police keywords often indicate police_action, but could be in crime reports
+            cat = "police_action"
+        elif any(k in low for k in safety_kw):
+            cat = "safety_measure"
+        else:
+            # default to property_crime if theft words present, else public_disturbance
+            cat = "property_crime" if any(w in low for w in ["theft", "robbery", "snatch"]) else "public_disturbance"
+
+        summary = para.split('\n')[0]
+        for loc in found_locs:
+            key = loc
+            if key not in out:
+                out[key] = {"incidents": [], "positive_events": []}
+            # decide whether this is positive event or incident
+            if cat in ["police_action", "safety_measure"]:
+                out[key]["positive_events"].append({
+                    "type": cat,
+                    "description": summary[:200],
+                    "original_text": para
+                })
+            else:
+                out[key]["incidents"].append({
+                    "type": cat,
+                    "description": summary[:200],
+                    "original_text": para
+                })
+    return out
+
 # --- Merge multiple model outputs (they obey the same top-level schema) ---
 def merge_model_locations(list_of_location_dicts):
     merged = {}
@@ -266,21 +403,85 @@ Do not invent facts.
 Do not add extra interpretation.
 """
 
-# --- Main function: extract, filter, call Gemini, merge, and compute final JSON ---
-def analyze_pdf_with_gemini(pdf_path, genai_model="gemini-2.5-flash", api_key: Optional[str] = None, api_key_envvar: str = "GENAI_API_KEY"):
-    # 1. Extract paragraphs
-    paragraphs = extract_paragraphs_from_pdf(pdf_path)
-    relevant = [p for p in paragraphs if is_relevant(p)]
-    if not relevant:
-        print("No relevant crime/safety paragraphs found.")
-        return None
+# Compact mode: paragraphs are numbered and the model cites ids instead of
+# echoing each paragraph back, which keeps output tokens (and latency) low for
+# stories that mention several places. original_text is filled in locally.
+COMPACT_PROMPT_HEADER = PROMPT_HEADER.replace(
+    "The full original paragraph",
+    "The id n of the paragraph (from its ===PARA n=== marker); do not copy the paragraph text",
+).replace(
+    "Copy the same classification, summary, and paragraph for both",
+    "Copy the same paragraph id, classification, and summary for both",
+)
+
+# Added when the local classifier has already categorized some paragraphs
+CATEGORY_HINT_NOTE = """
+Some paragraph markers carry a pre-assigned category, e.g. ===PARA (category: accident)===.
+Use that category for every entry from that paragraph; you still decide the locations.
+"""
 
-    # 2. Chunk the relevant paragraphs to avoid token overflow
-    max_chunk_chars = 12000  # conservative; tune based on model and tokens
+RESPONSE_MODES = ("full", "compact")
+
+def build_prompt(chunk, response_mode="compact", category_hints=None):
+    # category_hints: {paragraph: category} from the local classifier
+    hints = category_hints or {}
+    def marker(label, p):
+        return f"===PARA{label} (category: {hints[p]})===" if p in hints else f"===PARA{label}==="
+    header = COMPACT_PROMPT_HEADER if response_mode == "compact" else PROMPT_HEADER
+    if any(p in hints for p in chunk):
+        header += CATEGORY_HINT_NOTE
+    if response_mode == "compact":
+        prompt_paras = "\n\n".join([f"{marker(f' {n}', p)}\n{p}" for n, p in enumerate(chunk, 1)])
+    else:
+        prompt_paras = "\n\n".join([f"{marker('', p)}\n{p}" for p in chunk])
+    return header + "\n" + prompt_paras
+
+def rehydrate_compact_locations(compact_locations, chunk):
+    """
+    Turn CompactOutput locations back into the full incidents/positive_events
+    shape, looking up original_text by paragraph id. Unknown ids are dropped.
+    """
+    out = {}
+    for loc, data in compact_locations.items():
+        for entry in data.get("entries", []):
+            pid = entry.get("para_id")
+            if not isinstance(pid, int) or not 1 <= pid <= len(chunk):
+                print(f"Ignoring entry for {loc}: unknown paragraph id {pid}")
+                continue
+            if loc not in out:
+                out[loc] = {"incidents": [], "positive_events": []}
+            bucket = "positive_events" if entry.get("type") in POSITIVE_ADDITIONS else "incidents"
+            out[loc][bucket].append({
+                "type": entry.get("type"),
+                "description": entry.get("description"),
+                "original_text": chunk[pid - 1]
+            })
+    return out
+
+def request_chunk_locations(client, genai_model, chunk, response_mode="compact", category_hints=None):
+    """Send one chunk to the model and return its locations in the full shape."""
+    model_cls = CompactOutput if response_mode == "compact" else RootOutput
+    response = client.models.generate_content(
+        model=genai_model,
+        contents=build_prompt(chunk, response_mode, category_hints),
+        config={
+            "response_mime_type": "application/json",
+            # Use the Pydantic schema to instruct the model expected JSON shape
+            "response_json_schema": model_cls.model_json_schema(),
+        },
+    )
+    parsed = model_cls.model_validate_json(response.text)
+    locs = parsed.model_dump()["locations"]
+    if response_mode == "compact":
+        locs = rehydrate_compact_locations(locs, chunk)
+    return locs
+
+def chunk_paragraphs(paragraphs, max_chunk_chars=12000):
+    # max_chunk_chars is conservative; tune based on model and tokens
     chunks = []
     cur = []
     cur_len = 0
-    for p in relevant:
+    for p in paragraphs:
         plen = len(p)
         if cur_len + plen + 200 > max_chunk_chars and cur:
             chunks.append(cur)
@@ -291,42 +492,72 @@ def analyze_pdf_with_gemini(pdf_path, genai_model="gemini-2.5-flash", api_key: O
             cur_len += plen
     if cur:
         chunks.append(cur)
+    return chunks
 
-    # 3. Initialize genai client (use provided api_key or fall back to environment variable)
-    resolved_key = api_key or os.environ.get(api_key_envvar)
-    if not resolved_key:
-        raise RuntimeError(
-            f"No API key provided. Pass the API key as the second argument or set the {api_key_envvar} environment variable.\n"
-            "PowerShell example: $env:GENAI_API_KEY = \"YOUR_KEY\""
-        )
-    client = genai.Client(api_key=resolved_key)
-    # If your environment uses GOOGLE_API_KEY or another var, set accordingly.
+# --- Main function: extract, filter, call Gemini, merge, and compute final JSON ---
+def analyze_pdf_with_gemini(pdf_path, genai_model="gemini-2.5-flash", api_key: Optional[str] = None, api_key_envvar: str = "GENAI_API_KEY", extract_backend: Optional[str] = None, response_mode: str = "compact", client=None, score_state_path: Optional[str] = None, classifier_path: Optional[str] = None, classifier_threshold: Optional[float] = None):
+    if response_mode not in RESPONSE_MODES:
+        raise ValueError(f"response_mode must be one of {RESPONSE_MODES}, got {response_mode!r}")
+    # 1. Extract paragraphs
+    paragraphs = extract_paragraphs_from_pdf(pdf_path, backend=extract_backend)
+    relevant = [p for p in paragraphs if is_relevant(p)]
+    if not relevant:
+        print("No relevant crime/safety paragraphs found.")
+        return None
 
+    # 1b. Optional local classifier. It only decides what it can: confidently
+    # irrelevant paragraphs are dropped, and confidently categorized ones are
+    # handled locally only if they name a place from COORDINATE_LOOKUP. The rest
+    # of the confident ones go to the model with their category pre-filled.
     model_responses_locations = []
-    for i, chunk in enumerate(chunks):
-        prompt_paras = "\n\n".join([f"===PARA===\n{p}" for p in chunk])
-        prompt = PROMPT_HEADER + "\n" + prompt_paras
+    category_hints = {}
+    if classifier_path:
+        from relevance_classifier import DEFAULT_THRESHOLD, IRRELEVANT, RelevanceClassifier, route
+        threshold = DEFAULT_THRESHOLD if classifier_threshold is None else classifier_threshold
+        local, ambiguous, stats = route(RelevanceClassifier.load(classifier_path), relevant, threshold)
+        located = []
+        to_model = set(ambiguous)
+        for i, label in local.items():
+            if label == IRRELEVANT:
+                continue
+            places = known_places(relevant[i])
+            if places:
+                located.append((relevant[i], label, places))
+            else:
+                category_hints[relevant[i]] = label
+                to_model.add(i)
+        if located:
+            model_responses_locations.append(classified_locations(located))
+        calls_before = len(chunk_paragraphs(relevant))
+        relevant = [relevant[i] for i in sorted(to_model)]
+        stats["classified_locally"] = len(located)
+        stats["sent_with_category"] = len(category_hints)
+        stats["sent_to_model"] = len(relevant)
+        stats["model_calls_saved"] = calls_before - len(chunk_paragraphs(relevant))
+        print(f"Local classifier (threshold {threshold}): {json.dumps(stats)}")
+
+    # 2. Chunk the relevant paragraphs to avoid token overflow
+    chunks = chunk_paragraphs(relevant)
 
-        # Use the Pydantic schema to instruct the model expected JSON shape
-        schema = RootOutput.model_json_schema()
+    # 3. Initialize genai client (use provided api_key or fall back to environment variable)
+    if client is None and chunks:
+        resolved_key = api_key or os.environ.get(api_key_envvar)
+        if not resolved_key:
+            raise RuntimeError(
+                f"No API key provided. Pass the API key as the second argument or set the {api_key_envvar} environment variable.\n"
+                "PowerShell example: $env:GENAI_API_KEY = \"YOUR_KEY\""
+            )
+        client = genai.Client(api_key=resolved_key)
+        # If your environment uses GOOGLE_API_KEY or another var, set accordingly.
 
+    for i, chunk in enumerate(chunks):
         # Use retry/backoff for transient server errors (e.g., model overloaded)
         max_attempts = 5
         attempt = 0
         success = False
         while attempt < max_attempts and not success:
             try:
-                response = client.models.generate_content(
-                    model=genai_model,
-                    contents=prompt,
-                    config={
-                        "response_mime_type": "application/json",
-                        "response_json_schema": schema,
-                    },
-                )
-                text = response.text
-                parsed = RootOutput.model_validate_json(text)
-                locs = parsed.dict()["locations"]
+                locs = request_chunk_locations(client, genai_model, chunk, response_mode, category_hints)
                 model_responses_locations.append(locs)
                 success = True
             except Exception as e:
@@ -339,79 +570,6 @@ def analyze_pdf_with_gemini(pdf_path, genai_model="gemini-2.5-flash", api_key: O
                     time.sleep(wait)
                 else:
                     print("Max attempts reached; falling back to local rule-based processing for this chunk.")
-                    # Local fallback: deterministic extraction and classification
-                    def local_fallback_process_chunk(paragraphs):
-                        # Heuristic location detection and keyword classification
-                        place_suffixes = ["Nagar", "Tambaram", "Mylapore", "Velachery", "T Nagar", "T-Nagar", "Anna Nagar", "Road", "Street", "Colony", "Chennai", "Station"]
-                        violent_kw = ["murder", "kill", "stabbing", "shooting", "assault", "clash", "riot"]
-                        property_kw = ["robbery", "theft", "pickpocket", "snatch", "chain snatch", "burglary", "steal"]
-                        accident_kw = ["accident", "crash", "collision", "derail", "train", "fatality", "killed", "injured"]
-                        disturbance_kw = ["protest", "riot", "disturbance", "clash"]
-                        police_kw = ["arrest", "police", "raid", "crackdown", "seized"]
-                        safety_kw = ["safety", "evacuate", "precaution", "announced", "caution", "rescue", "operation"]
-
-                        out = {}
-                        for para in paragraphs:
-                            low = para.lower()
-                            # find candidate locations by suffixes
-                            found_locs = []
-                            for suf in place_suffixes:
-                                if suf.lower() in low:
-                                    # find the full token(s) containing the suffix
-                                    matches = re.findall(r"([A-Z][A-Za-z0-9\- ]+" + re.escape(suf) + r")", para)
-                                    for m in matches:
-                                        m = m.strip()
-                                        if m not in found_locs:
-                                            found_locs.append(m)
-                            # fallback: look for proper nouns of 2 words (e.g., 'T Nagar', 'Anna Nagar')
-                            if not found_locs:
-                                pn = re.findall(r"\b([A-Z][a-z]+(?:\s[A-Z][a-z]+){0,2})\b", para)
-                                # filter common non-place words
-                                for cand in pn:
-                                    if len(cand) > 2 and not cand.lower().startswith("police") and not cand.lower().startswith("the"):
-                                        found_locs.append(cand)
-                            if not found_locs:
-                                found_locs = ["Unknown"]
-
-                            # classify
-                            cat = None
-                            if any(k in low for k in violent_kw):
-                                cat = "violent_crime"
-                            elif any(k in low for k in property_kw):
-                                cat = "property_crime"
-                            elif any(k in low for k in accident_kw):
-                                cat = "accident"
-                            elif any(k in low for k in disturbance_kw):
-                                cat = "public_disturbance"
-                            elif any(k in low for k in police_kw):
-                                # police keywords often indicate police_action, but could be in crime reports
-                                cat = "police_action"
-                            elif any(k in low for k in safety_kw):
-                                cat = "safety_measure"
-                            else:
-                                # default to property_crime if theft words present, else public_disturbance
-                                cat = "property_crime" if any(w in low for w in ["theft", "robbery", "snatch"]) else "public_disturbance"
-
-                            summary = para.split('\n')[0]
-                            for loc in found_locs:
-                                key = loc
-                                if key not in out:
-                                    out[key] = {"incidents": [], "positive_events": []}
-                                # decide whether this is positive event or incident
-                                if cat in ["police_action", "safety_measure"]:
-                                    out[key]["positive_events"].append({
-                                        "type": cat,
-                                        "description": summary[:200],
-                                        "original_text": para
-                                    })
-                                else:
-                                    out[key]["incidents"].append({
-                                        "type": cat,
-                                        "description": summary[:200],
-                                        "original_text": para
-                                    })
-                        return out
-
                     locs = local_fallback_process_chunk(chunk)
                     model_responses_locations.append(locs)
 
@@ -428,46 +586,20 @@ def analyze_pdf_with_gemini(pdf_path, genai_model="gemini-2.5-flash", api_key: O
         "positive_additions": POSITIVE_ADDITIONS
     }
 
-    # Build output in the user-requested structure:
-    # {
-    #   "locations": {
-    #     "LocationName": {
-    #       "coordinates": {"lat": 0, "lng": 0},
-    #       "incidents": [ {"category":..., "summary":..., "original_text":...} ]
-    #     }
-    #   }
-    # }
-    output_locations = {}
-    for loc, data in scored.items():
-        incidents_out = []
-        # include model-detected incidents
-        for inc in data.get("incidents", []):
-            incidents_out.append({
-                "category": inc.get("type"),
-                "summary": inc.get("description"),
-                "original_text": inc.get("original_text")
-            })
-        # include positive events as incidents as well (user schema uses single incidents list)
-        for pos in data.get("positive_events", []):
-            incidents_out.append({
-                "category": pos.get("type"),
-                "summary": pos.get("description"),
-                "original_text": pos.get("original_text")
-            })
-
-        coords = get_coordinates_for_place(loc)
-        output_locations[loc] = {
-            "coordinates": coords,
-            "incidents": incidents_out,
-            "score_before_clamp": data.get("score_before_clamp"),
-            "final_score_10_scale": data.get("final_score_10_scale")
-        }
+    output_locations = build_output_locations(scored)
 
     # Aggregate city-level points (scores) and coordinates
     cities = aggregate_city_scores(output_locations)
 
     root = {"locations": output_locations, "cities": cities, "algorithm_used": algorithm_used}
 
+    # Optional running scores across editions: only places/cities in this PDF are
+    # touched, and score_changes lists the scores that moved
+    if score_state_path:
+        state = ScoringState.load(score_state_path, BASE_SCORE, {**CRIME_PENALTIES, **POSITIVE_ADDITIONS}, 0, 10, city_of=detect_city)
+        root["score_changes"] = state.apply_batch(merged, batch_id=edition_source(pdf_path))
+        state.save(score_state_path)
+
     # Validate final JSON against RootOutput model (optional)
     # (We convert nested dicts into the LocationData structure)
     # For safety, we won't strictly validate to avoid over-strictness, but you can:
@@ -486,4 +618,14 @@ if __name__ == "__main__":
         sys.exit(1)
     pdf_path = sys.argv[1]
     provided_key = sys.argv[2] if len(sys.argv) >= 3 else None
-    analyze_pdf_with_gemini(pdf_path, api_key=provided_key)
+    # GENAI_RESPONSE_MODE=full makes the model echo every paragraph back (slower, larger output)
+    analyze_pdf_with_gemini(
+        pdf_path,
+        api_key=provided_key,
+        response_mode=os.environ.get("GENAI_RESPONSE_MODE", "compact"),
+        # own state file: SCORE_STATE_PATH is ingest_to_supabase.py's 0-100 state
+        score_state_path=os.environ.get("ANALYSIS_SCORE_STATE_PATH"),
+        # RELEVANCE_MODEL: classifier trained with relevance_classifier.py
+        # (its confidence threshold defaults to $env:CLASSIFIER_THRESHOLD)
+        classifier_path=os.environ.get("RELEVANCE_MODEL"),
+    )
@@ -0,0 +1,348 @@
+"""
+Newspaper Text Extraction
+-------------------------
+One extraction interface with interchangeable backends, shared by `main.py`
+and `ingest_to_supabase.py`.
+
+Backends turn an edition into per-page text; `segment_paragraphs` then splits
+that text into paragraphs, reading multi-column layouts column by column.
+
+Backends:
+    pdfplumber  - accurate, slowest (word positions)
+    pypdfium2   - fast PDFium text layer
+    pdfminer    - pdfminer.six text lines with tuned LAParams
+    text        - pre-converted .txt / .html feeds (pages split on form feeds)
+
+The backend can be chosen per call or through the EXTRACT_BACKEND
+environment variable.
+"""
+
+import math
+import os
+import re
+from html.parser import HTMLParser
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+DEFAULT_BACKEND = "pdfplumber"
+TEXT_EXTENSIONS = (".txt", ".text", ".html", ".htm")
+
+# A gutter is a run of at least this many blank character columns shared by
+# most non-empty lines of a page.
+MIN_GUTTER_WIDTH = 3
+GUTTER_LINE_RATIO = 0.9
+MIN_COLUMN_LINES = 4
+
+# pdfminer layout tuning for dense newspaper columns: a small char_margin stops
+# text lines from bridging narrow gutters, and layout analysis of boxes is
+# skipped because lines are placed on the grid by position anyway.
+PDFMINER_LAPARAMS = {
+    "line_margin": 0.3,
+    "char_margin": 1.0,
+    "word_margin": 0.1,
+    "boxes_flow": None,
+}
+
+
+# --- Backends: path -> iterator of page texts ---
+Fragment = Tuple[float, float, float, float, str]  # (x0, top, x1, bottom, text)
+
+
+def _fragment_columns(fragments: List[Fragment], char_w: float) -> List[List[Fragment]]:
+    """
+    Split a page's fragments into columns at x-gutters: character-wide strips
+    that (almost) no fragment covers, with text on both sides. Fragments go
+    to the column their left edge falls in, so a headline spanning the
+    gutter stays with the column it starts in.
+    """
+    if len(fragments) < MIN_COLUMN_LINES:
+        return [fragments]
+    left = min(f[0] for f in fragments)
+    n_bins = int((max(f[2] for f in fragments) - left) / char_w) + 1
+    coverage = [0] * n_bins
+    for x0, _, x1, _, _ in fragments:
+        for b in range(int((x0 - left) / char_w), min(n_bins, int(math.ceil((x1 - left) / char_w)))):
+            coverage[b] += 1
+    covered = sorted(c for c in coverage if c)
+    threshold = (1 - GUTTER_LINE_RATIO) * covered[len(covered) // 2]
+
+    cuts: List[float] = []
+    run_start = None
+    for b, count in enumerate(coverage + [threshold + 1]):
+        if count <= threshold:
+            if run_start is None:
+                run_start = b
+        elif run_start is not None:
+            if b - run_start >= MIN_GUTTER_WIDTH and run_start > 0 and b < n_bins:
+                cuts.append(left + (run_start + b) / 2 * char_w)
+            run_start = None
+    if not cuts:
+        return [fragments]
+    columns: List[List[Fragment]] = [[] for _ in range(len(cuts) + 1)]
+    for frag in fragments:
+        columns[sum(1 for c in cuts if frag[0] >= c)].append(frag)
+    return [col for col in columns if col]
+
+
+def _render_column(fragments: List[Fragment], char_w: float, line_h: float) -> List[str]:
+    """Lay one column's fragments out as text lines, relative to its left edge."""
+    origin = min(f[0] for f in fragments)
+
+    # cluster fragments into text lines by vertical centre
+    lines: List[Tuple[float, List[Tuple[float, str]]]] = []
+    for x0, top, _, bottom, text in sorted(fragments, key=lambda f: (f[1] + f[3]) / 2):
+        centre = (top + bottom) / 2
+        if lines and centre - lines[-1][0] <= 0.5 * line_h:
+            lines[-1][1].append((x0, text))
+        else:
+            lines.append((centre, [(x0, text)]))
+
+    # the column's common line-to-line distance; larger gaps become blank rows
+    gaps = [b[0] - a[0] for a, b in zip(lines, lines[1:])]
+    if gaps:
+        smallest = min(gaps)
+        close = sorted(g for g in gaps if g <= 1.5 * smallest)
+        pitch = close[len(close) // 2]
+    else:
+        pitch = line_h
+    out: List[str] = []
+    prev_centre = None
+    for centre, frags in lines:
+        if prev_centre is not None:
+            out.extend([""] * max(0, int(round((centre - prev_centre) / pitch)) - 1))
+        prev_centre = centre
+        line = ""
+        for x0, text in sorted(frags):
+            col = int(round((x0 - origin) / char_w))
+            line = line.ljust(col) if len(line) < col else line + " "
+            line += text
+        out.append(line)
+    return out
+
+
+def _layout_from_fragments(fragments: List[Fragment]) -> str:
+    """
+    Render positioned text fragments (x0, top, x1, bottom, text) as plain
+    text for `segment_paragraphs`: columns are split first (so baselines
+    offset between columns cannot interleave), then each column is laid out
+    on a character grid with paragraph gaps kept as blank lines. Columns are
+    emitted one after another, separated by a blank line.
+    """
+    fragments = [f for f in fragments if f[4].strip() and f[2] > f[0]]
+    if not fragments:
+        return ""
+    char_w = sorted((x1 - x0) / len(t) for x0, _, x1, _, t in fragments)[len(fragments) // 2]
+    line_h = sorted(b - t for _, t, _, b, _ in fragments)[len(fragments) // 2] or 1.0
+    columns = _fragment_columns(fragments, char_w)
+    return "\n\n".join("\n".join(_render_column(col, char_w, line_h)) for col in columns)
+
+
+def _pages_pdfplumber(path: str) -> Iterator[str]:
+    import pdfplumber
+
+    with pdfplumber.open(path) as pdf:
+        for page in pdf.pages:
+            # pdfplumber's own layout mode assumes a fixed character width and
+            # runs small-type columns together, so place the words ourselves
+            words = page.extract_words(use_text_flow=False)
+            yield _layout_from_fragments(
+                [(w["x0"], w["top"], w["x1"], w["bottom"], w["text"]) for w in words]
+            )
+
+
+def _pages_pypdfium2(path: str) -> Iterator[str]:
+    import pypdfium2 as pdfium
+
+    pdf = pdfium.PdfDocument(path)
+    try:
+        for i in range(len(pdf)):
+            page = pdf[i]
+            textpage = page.get_textpage()
+            try:
+                # PDFium's plain text has no layout; rebuild it from the text
+                # rects (one per run of text on a line)
+                height = page.get_height()
+                fragments = []
+                for r in range(textpage.count_rects()):
+                    left, bottom, right, top = textpage.get_rect(r)
+                    text = textpage.get_text_bounded(left, bottom, right, top)
+                    fragments.append((left, height - top, right, height - bottom,
+                                      " ".join(text.split())))
+                yield _layout_from_fragments(fragments)
+            finally:
+                textpage.close()
+                page.close()
+    finally:
+        pdf.close()
+
+
+def _pages_pdfminer(path: str) -> Iterator[str]:
+    from pdfminer.high_level import extract_pages
+    from pdfminer.layout import LAParams, LTTextContainer, LTTextLine
+
+    laparams = LAParams(**PDFMINER_LAPARAMS)
+    for layout in extract_pages(path, laparams=laparams):
+        height = layout.height
+        fragments = []
+        for box in layout:
+            if not isinstance(box, LTTextContainer):
+                continue
+            for line in box:
+                if isinstance(line, LTTextLine):
+                    fragments.append((line.x0, height - line.y1, line.x1, height - line.y0,
+                                      " ".join(line.get_text().split())))
+        yield _layout_from_fragments(fragments)
+
+
+class _HTMLTextParser(HTMLParser):
+    """Collect visible text, turning block-level elements into blank lines."""
+
+    BLOCK_TAGS = {"p", "div", "br", "li", "h1", "h2", "h3", "h4", "h5", "h6",
+                  "article", "section", "tr", "blockquote", "hr"}
+    SKIP_TAGS = {"script", "style", "head", "title"}
+
+    def __init__(self):
+        super().__init__()
+        self.parts: List[str] = []
+        self._skip = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIP_TAGS:
+            self._skip += 1
+        elif tag in self.BLOCK_TAGS:
+            self.parts.append("\n\n")
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIP_TAGS:
+            self._skip = max(0, self._skip - 1)
+        elif tag in self.BLOCK_TAGS:
+            self.parts.append("\n\n")
+
+    def handle_data(self, data):
+        if not self._skip:
+            self.parts.append(data.replace("\n", " "))
+
+
+def _pages_text(path: str) -> Iterator[str]:
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        raw = f.read()
+    if path.lower().endswith((".html", ".htm")):
+        parser = _HTMLTextParser()
+        parser.feed(raw)
+        parser.close()
+        raw = "".join(parser.parts)
+    for page in raw.split("\f"):
+        yield page
+
+
+EXTRACTION_BACKENDS: Dict[str, Callable[[str], Iterator[str]]] = {
+    "pdfplumber": _pages_pdfplumber,
+    "pypdfium2": _pages_pypdfium2,
+    "pdfminer": _pages_pdfminer,
+    "text": _pages_text,
+}
+
+
+def resolve_backend(path: str, backend: Optional[str] = None) -> str:
+    """Pick a backend: explicit argument, then file type, then EXTRACT_BACKEND."""
+    if backend:
+        name = backend
+    elif path.lower().endswith(TEXT_EXTENSIONS):
+        name = "text"
+    else:
+        name = os.environ.get("EXTRACT_BACKEND") or DEFAULT_BACKEND
+    if name not in EXTRACTION_BACKENDS:
+        raise ValueError(
+            f"Unknown extraction backend '{name}'. "
+            f"Choose one of: {', '.join(EXTRACTION_BACKENDS)}"
+        )
+    return name
+
+
+def extract_pages(path: str, backend: Optional[str] = None) -> Iterator[str]:
+    """Yield the raw text of each page using the selected backend."""
+    name = resolve_backend(path, backend)
+    for text in EXTRACTION_BACKENDS[name](path):
+        yield text.replace("\r\n", "\n").replace("\r", "\n")
+
+
+# --- Column-aware paragraph segmentation ---
+def _find_gutters(lines: List[str]) -> List[Tuple[int, int]]:
+    """Return (start, end) character spans that are blank on most text lines."""
+    text_lines = [ln for ln in lines if ln.strip()]
+    if len(text_lines) < MIN_COLUMN_LINES:
+        return []
+    width = max(len(ln) for ln in text_lines)
+    left = min(len(ln) - len(ln.lstrip()) for ln in text_lines)
+    threshold = GUTTER_LINE_RATIO * len(text_lines)
+
+    gutters = []
+    run_start = None
+    for col in range(left, width + 1):
+        blank = 0
+        if col < width:
+            for ln in text_lines:
+                if col >= len(ln) or ln[col] == " ":
+                    blank += 1
+        # a column position counts as gutter only if text exists on both sides,
+        # so the ragged right margin is never mistaken for one
+        is_gap = col < width and blank >= threshold
+        if is_gap and run_start is None:
+            run_start = col
+        elif not is_gap and run_start is not None:
+            if col - run_start >= MIN_GUTTER_WIDTH and run_start > left and col < width:
+                gutters.append((run_start, col))
+            run_start = None
+    return gutters
+
+
+def _split_columns(lines: List[str]) -> List[List[str]]:
+    gutters = _find_gutters(lines)
+    if not gutters:
+        return [lines]
+    cuts = [0] + [(a + b) // 2 for a, b in gutters] + [None]
+    columns = []
+    for start, end in zip(cuts, cuts[1:]):
+        columns.append([ln[start:end] for ln in lines])
+    return columns
+
+
+def segment_paragraphs(page_text: str, min_chars: int = 0) -> List[str]:
+    """
+    Split one page of text into paragraphs.
+
+    Columns separated by a consistent gutter are read top to bottom, left to
+    right; paragraphs break on blank lines. Whitespace is collapsed and
+    paragraphs of `min_chars` or fewer characters are dropped.
+    """
+    if not page_text or not page_text.strip():
+        return []
+    lines = page_text.split("\n")
+    paragraphs = []
+    for column in _split_columns(lines):
+        block: List[str] = []
+        for ln in column + [""]:
+            if ln.strip():
+                block.append(ln.strip())
+                continue
+            if block:
+                para = re.sub(r"\s+", " ", " ".join(block)).strip()
+                if para and len(para) > min_chars:
+                    paragraphs.append(para)
+                block = []
+    return paragraphs
+
+
+def extract_paragraphs_with_pages(path: str, backend: Optional[str] = None,
+                                  min_chars: int = 0) -> List[Tuple[int, str]]:
+    """Extract (page_number, paragraph) pairs; page numbers start at 1."""
+    out = []
+    for page_num, text in enumerate(extract_pages(path, backend), 1):
+        for para in segment_paragraphs(text, min_chars=min_chars):
+            out.append((page_num, para))
+    return out
+
+
+def extract_paragraphs(path: str, backend: Optional[str] = None,
+                       min_chars: int = 0) -> List[str]:
+    """Extract paragraphs from a PDF or pre-converted text/HTML edition."""
+    return [p for _, p in extract_paragraphs_with_pages(path, backend, min_chars)]
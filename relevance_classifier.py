@@ -0,0 +1,296 @@
+"""
+Local Relevance Classifier
+--------------------------
+Small linear model that decides, before any Gemini call, whether a paragraph
+is irrelevant (obituaries, ads that merely mention "killed" or "safety") or
+which incident category it belongs to. `main.py` drops confidently irrelevant
+paragraphs and handles confidently categorized ones without the model when
+they name a known place; the others go to the model, with the category
+pre-filled when the classifier was confident.
+
+The confidence threshold defaults to $CLASSIFIER_THRESHOLD (0.9).
+
+Features are hashed word unigrams and bigrams (log term frequency, L2
+normalized); the model is multinomial logistic regression over
+"irrelevant" + the incident categories, scored for a whole batch at once with
+NumPy.
+
+Training data comes from output we already have: `*_parsed.json` dumps and
+`main.py` results (including local fallback results) give labeled paragraphs;
+paragraphs of the same editions that produced no incident are "irrelevant".
+
+Requirements: numpy
+
+Usage:
+    python relevance_classifier.py train Report_parsed.json --editions Report.pdf
+    python relevance_classifier.py predict Report.pdf [--threshold 0.9]
+"""
+
+import argparse
+import json
+import os
+import re
+import zlib
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from incident_index import iter_incident_records
+
+DEFAULT_MODEL_PATH = os.environ.get("RELEVANCE_MODEL", "relevance_model.npz")
+DEFAULT_THRESHOLD = float(os.environ.get("CLASSIFIER_THRESHOLD", "0.9"))
+
+IRRELEVANT = "irrelevant"
+CLASSES = [IRRELEVANT, "violent_crime", "property_crime", "public_disturbance",
+           "accident", "police_action", "safety_measure"]
+N_FEATURES = 2 ** 18
+
+
+# --- Features ---
+def _ngrams(text: str) -> List[str]:
+    words = re.findall(r"[a-z0-9]+", text.lower())
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+def featurize(texts: Sequence[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Hash a batch of texts into a CSR matrix (indptr, indices, values).
+    crc32 is used instead of hash() so feature ids are stable across runs.
+    """
+    indptr = [0]
+    indices: List[int] = []
+    values: List[float] = []
+    for text in texts:
+        counts: Dict[int, int] = {}
+        for gram in _ngrams(text):
+            h = zlib.crc32(gram.encode("utf-8")) % N_FEATURES
+            counts[h] = counts.get(h, 0) + 1
+        row = np.log1p(np.fromiter(counts.values(), dtype=np.float32, count=len(counts)))
+        norm = float(np.sqrt((row * row).sum())) or 1.0
+        indices.extend(counts.keys())
+        values.extend((row / norm).tolist())
+        indptr.append(len(indices))
+    return (np.asarray(indptr, dtype=np.int64), np.asarray(indices, dtype=np.int64),
+            np.asarray(values, dtype=np.float32))
+
+
+def _row_ids(indptr: np.ndarray) -> np.ndarray:
+    return np.repeat(np.arange(len(indptr) - 1), np.diff(indptr))
+
+
+# --- Model ---
+class RelevanceClassifier:
+    """Multinomial logistic regression over hashed n-gram features."""
+
+    def __init__(self, weights: Optional[np.ndarray] = None, bias: Optional[np.ndarray] = None,
+                 classes: Sequence[str] = CLASSES):
+        self.classes = list(classes)
+        k = len(self.classes)
+        self.weights = weights if weights is not None else np.zeros((N_FEATURES, k), dtype=np.float32)
+        self.bias = bias if bias is not None else np.zeros(k, dtype=np.float32)
+
+    def _logits(self, indptr, indices, values) -> np.ndarray:
+        n = len(indptr) - 1
+        logits = np.tile(self.bias, (n, 1))
+        nonempty = np.diff(indptr) > 0
+        if nonempty.any():
+            # per-row sums of weight rows; empty rows are skipped since reduceat
+            # would otherwise copy the next row's first element into them
+            contrib = self.weights[indices] * values[:, None]
+            logits[nonempty] += np.add.reduceat(contrib, indptr[:-1][nonempty], axis=0)
+        return logits
+
+    def predict_proba(self, texts: Sequence[str]) -> np.ndarray:
+        """Class probabilities, shape (len(texts), len(classes))."""
+        if not texts:
+            return np.zeros((0, len(self.classes)), dtype=np.float32)
+        logits = self._logits(*featurize(texts))
+        logits -= logits.max(axis=1, keepdims=True)
+        p = np.exp(logits)
+        return p / p.sum(axis=1, keepdims=True)
+
+    def predict(self, texts: Sequence[str]) -> List[Tuple[str, float]]:
+        """(label, confidence) per text."""
+        proba = self.predict_proba(texts)
+        best = proba.argmax(axis=1)
+        return [(self.classes[i], float(proba[r, i])) for r, i in enumerate(best)]
+
+    def fit(self, texts: Sequence[str], labels: Sequence[str], epochs: int = 30,
+            lr: float = 0.2, l2: float = 1e-4, batch_size: int = 256, seed: int = 0):
+        """Mini-batch gradient descent on class-balanced cross-entropy."""
+        y = np.array([self.classes.index(label) for label in labels])
+        indptr, indices, values = featurize(texts)
+        n = len(y)
+        # balance classes so a pile of "irrelevant" paragraphs doesn't swamp the rest
+        freq = np.bincount(y, minlength=len(self.classes)).astype(np.float32)
+        sample_w = (n / (len(self.classes) * np.maximum(freq, 1)))[y]
+        rng = np.random.default_rng(seed)
+        for _ in range(epochs):
+            order = rng.permutation(n)
+            for start in range(0, n, batch_size):
+                rows = order[start:start + batch_size]
+                b_ptr, b_idx, b_val = _slice_csr(indptr, indices, values, rows)
+                logits = self._logits(b_ptr, b_idx, b_val)
+                logits -= logits.max(axis=1, keepdims=True)
+                p = np.exp(logits)
+                p /= p.sum(axis=1, keepdims=True)
+                p[np.arange(len(rows)), y[rows]] -= 1.0
+                p *= sample_w[rows, None]
+                # features are sparse, so each weight row takes the summed (not
+                # averaged) gradient of the examples it occurs in; the shared
+                # bias takes the batch mean
+                uniq, inv = np.unique(b_idx, return_inverse=True)
+                grad = np.zeros((len(uniq), len(self.classes)), dtype=np.float32)
+                np.add.at(grad, inv, b_val[:, None] * p[_row_ids(b_ptr)])
+                self.weights[uniq] -= lr * (grad + l2 * self.weights[uniq])
+                self.bias -= lr * p.mean(axis=0)
+        return self
+
+    def save(self, path: str):
+        rows = np.flatnonzero(np.any(self.weights != 0, axis=1))
+        np.savez_compressed(path, rows=rows, weights=self.weights[rows], bias=self.bias,
+                            classes=np.array(self.classes))
+
+    @classmethod
+    def load(cls, path: str) -> "RelevanceClassifier":
+        data = np.load(path)
+        classes = [str(c) for c in data["classes"]]
+        weights = np.zeros((N_FEATURES, len(classes)), dtype=np.float32)
+        weights[data["rows"]] = data["weights"]
+        return cls(weights, data["bias"].astype(np.float32), classes)
+
+
+def _slice_csr(indptr, indices, values, rows):
+    starts, ends = indptr[rows], indptr[rows + 1]
+    lengths = ends - starts
+    take = np.concatenate([np.arange(s, e) for s, e in zip(starts, ends)]) if len(rows) else np.array([], np.int64)
+    b_ptr = np.concatenate([[0], np.cumsum(lengths)])
+    return b_ptr, indices[take], values[take]
+
+
+# --- Routing ---
+def route(classifier: RelevanceClassifier, paragraphs: Sequence[str],
+          threshold: float = DEFAULT_THRESHOLD) -> Tuple[Dict[int, str], List[int], Dict[str, int]]:
+    """
+    Split paragraphs by classifier confidence.
+
+    Returns (local, ambiguous, stats): `local` maps paragraph index -> label for
+    predictions at or above `threshold` (label may be "irrelevant"),
+    `ambiguous` lists indices that still need the model.
+    """
+    local: Dict[int, str] = {}
+    ambiguous: List[int] = []
+    for i, (label, conf) in enumerate(classifier.predict(paragraphs)):
+        if conf >= threshold:
+            local[i] = label
+        else:
+            ambiguous.append(i)
+    dropped = sum(1 for label in local.values() if label == IRRELEVANT)
+    stats = {
+        "paragraphs": len(paragraphs),
+        "dropped_irrelevant": dropped,
+        "classified_locally": len(local) - dropped,
+        "sent_to_model": len(ambiguous),
+    }
+    return local, ambiguous, stats
+
+
+# --- Training data ---
+def load_labeled(parsed_paths: Sequence[str]) -> Dict[str, str]:
+    """paragraph -> category from parsed outputs (majority label if a paragraph repeats)."""
+    votes: Dict[str, Dict[str, int]] = {}
+    for path in parsed_paths:
+        with open(path, "r", encoding="utf-8") as f:
+            parsed = json.load(f)
+        for rec in iter_incident_records(parsed, os.path.basename(path)):
+            if rec["text"] and rec["category"] in CLASSES:
+                v = votes.setdefault(rec["text"], {})
+                v[rec["category"]] = v.get(rec["category"], 0) + 1
+    return {text: max(v, key=v.get) for text, v in votes.items()}
+
+
+def _normalize(text: str) -> str:
+    return " ".join(re.findall(r"[a-z0-9]+", text.lower()))
+
+
+def build_training_set(parsed_paths: Sequence[str], edition_paths: Sequence[str],
+                       min_chars: int = 50) -> Tuple[List[str], List[str]]:
+    labeled = load_labeled(parsed_paths)
+    texts, labels = list(labeled), list(labeled.values())
+    if edition_paths:
+        from pdf_extract import extract_paragraphs
+        # labels may come from an older extraction with different paragraph
+        # boundaries; paragraphs overlapping a labeled one are left out rather
+        # than taught as "irrelevant"
+        labeled_norm = [_normalize(t) for t in labeled]
+        seen = set()
+        for path in edition_paths:
+            for para in extract_paragraphs(path, min_chars=min_chars):
+                norm = _normalize(para)
+                if norm in seen or any(norm in t or t in norm for t in labeled_norm):
+                    continue
+                seen.add(norm)
+                texts.append(para)
+                labels.append(IRRELEVANT)
+    return texts, labels
+
+
+def evaluate(classifier: RelevanceClassifier, texts: Sequence[str], labels: Sequence[str],
+             thresholds: Sequence[float] = (0.5, 0.7, 0.8, 0.9, 0.95)):
+    """Print coverage (share handled locally) and accuracy of local decisions per threshold."""
+    preds = classifier.predict(texts)
+    for t in thresholds:
+        local = [(p, y) for (p, c), y in zip(preds, labels) if c >= t]
+        acc = sum(p == y for p, y in local) / len(local) if local else float("nan")
+        print(f"  threshold {t:.2f}: {len(local) / len(texts):6.1%} handled locally, "
+              f"accuracy {acc:6.1%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local relevance/category classifier")
+    parser.add_argument("--model", default=DEFAULT_MODEL_PATH)
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_train = sub.add_parser("train", help="train from parsed JSON outputs")
+    p_train.add_argument("parsed", nargs="+", help="*_parsed.json / main.py output files")
+    p_train.add_argument("--editions", nargs="*", default=[],
+                         help="source editions; unlabeled paragraphs become 'irrelevant'")
+    p_train.add_argument("--epochs", type=int, default=30)
+    p_train.add_argument("--holdout", type=float, default=0.2)
+    p_predict = sub.add_parser("predict", help="classify paragraphs of an edition")
+    p_predict.add_argument("edition")
+    p_predict.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    args = parser.parse_args()
+
+    if args.command == "train":
+        texts, labels = build_training_set(args.parsed, args.editions)
+        if not texts:
+            print("❌ No labeled paragraphs found")
+            return
+        counts = {c: labels.count(c) for c in CLASSES if labels.count(c)}
+        print(f"📚 {len(texts)} paragraphs: {counts}")
+        order = np.random.default_rng(0).permutation(len(texts))
+        n_test = int(len(texts) * args.holdout) if len(texts) >= 10 else 0
+        test, train = order[:n_test], order[n_test:]
+        clf = RelevanceClassifier().fit([texts[i] for i in train], [labels[i] for i in train],
+                                        epochs=args.epochs)
+        if n_test:
+            print("🧪 Holdout:")
+            evaluate(clf, [texts[i] for i in test], [labels[i] for i in test])
+        # final model uses every example
+        clf = RelevanceClassifier().fit(texts, labels, epochs=args.epochs)
+        clf.save(args.model)
+        print(f"💾 Saved model to {args.model}")
+    else:
+        from pdf_extract import extract_paragraphs
+        paragraphs = extract_paragraphs(args.edition)
+        clf = RelevanceClassifier.load(args.model)
+        local, ambiguous, stats = route(clf, paragraphs, args.threshold)
+        for i, label in sorted(local.items()):
+            print(f"{label:<18} {paragraphs[i][:90]}")
+        for i in ambiguous:
+            print(f"{'?':<18} {paragraphs[i][:90]}")
+        print(f"\n{json.dumps(stats)}")
+
+
+if __name__ == "__main__":
+    main()
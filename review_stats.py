@@ -0,0 +1,43 @@
+"""
+Incident Reviews
+----------------
+Builds the `place_reviews` rows ingestion inserts for a place's top incidents.
+
+Per-place review aggregates (count, rating sums, rating histogram, tag counts)
+are not computed here: statement-level triggers in
+`safespot/database/schema.sql` merge every insert, update or delete on
+place_reviews into `place_review_stats` with one upsert, and the API serves
+that row (`getReviewSummary`).
+
+Usage (from ingest_to_supabase.py):
+    reviews.extend(incident_reviews(place_id, incidents))
+"""
+
+from typing import Any, Dict, List
+
+# Incident category -> 1-5 review rating
+INCIDENT_REVIEW_RATINGS = {
+    "violent_crime": 1,
+    "property_crime": 2,
+    "accident": 2,
+    "public_disturbance": 3,
+    "safety_measure": 5,
+}
+REVIEWS_PER_PLACE = 3  # top incidents per place turned into reviews
+
+
+def incident_reviews(place_id: Any, incidents: List[Dict]) -> List[Dict[str, Any]]:
+    """`place_reviews` rows for a place's top incidents."""
+    rows = []
+    for incident in incidents[:REVIEWS_PER_PLACE]:
+        category = incident["category"]
+        rating = INCIDENT_REVIEW_RATINGS.get(category, 3)
+        rows.append({
+            "place_id": place_id,
+            "safety_rating": rating,
+            "overall_rating": rating,
+            "review_text": f"[PDF] {incident['summary']}",
+            "tags": [category, "pdf_extract"],
+            "is_verified": True,
+        })
+    return rows
@@ -122,6 +122,24 @@ CREATE INDEX idx_reviews_created ON place_reviews(created_at DESC);
 CREATE INDEX idx_reviews_tags ON place_reviews USING GIN(tags);
 
 
+-- 3b. Place Review Stats (precomputed per-place rollup of place_reviews)
+-- Kept in sync by statement-level triggers on place_reviews (see FUNCTIONS &
+-- TRIGGERS): each INSERT/UPDATE/DELETE statement, e.g. one bulk insert of an
+-- ingest batch, is merged with a single upsert. Averages are sum / count.
+CREATE TABLE place_review_stats (
+  place_id UUID PRIMARY KEY REFERENCES places(id) ON DELETE CASCADE,
+  
+  review_count INT NOT NULL DEFAULT 0,
+  safety_rating_sum INT NOT NULL DEFAULT 0,
+  overall_rating_count INT NOT NULL DEFAULT 0,
+  overall_rating_sum INT NOT NULL DEFAULT 0,
+  rating_histogram JSONB NOT NULL DEFAULT '{"1": 0, "2": 0, "3": 0, "4": 0, "5": 0}', -- safety ratings
+  tag_counts JSONB NOT NULL DEFAULT '{}', -- {"violent_crime": 3, "pdf_extract": 5}
+  
+  updated_at TIMESTAMP DEFAULT NOW()
+);
+
+
 -- 4. Place Safety History (Time-Series)
 CREATE TABLE place_safety_history (
   id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
@@ -281,10 +299,138 @@ CREATE TRIGGER update_safety_attrs_updated_at BEFORE UPDATE ON place_safety_attr
 CREATE TRIGGER update_reviews_updated_at BEFORE UPDATE ON place_reviews
   FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
 
+CREATE TRIGGER update_review_stats_updated_at BEFORE UPDATE ON place_review_stats
+  FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+
 CREATE TRIGGER update_users_updated_at BEFORE UPDATE ON users
   FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
 
 
+
+-- Review stats rollup: add two {key: count} objects
+CREATE OR REPLACE FUNCTION jsonb_add_counts(a JSONB, b JSONB)
+RETURNS JSONB AS $$
+  SELECT COALESCE(jsonb_object_agg(key, total), '{}'::jsonb)
+  FROM (
+    SELECT key, SUM(value::int) AS total
+    FROM (
+      SELECT * FROM jsonb_each_text(COALESCE(a, '{}'::jsonb))
+      UNION ALL
+      SELECT * FROM jsonb_each_text(COALESCE(b, '{}'::jsonb))
+    ) kv
+    GROUP BY key
+  ) t;
+$$ LANGUAGE sql IMMUTABLE;
+
+
+-- Merge review rows into place_review_stats with one upsert.
+-- changes: JSON array of place_reviews rows, each with "sign" 1 (added) or -1 (removed).
+-- ON CONFLICT increments under the row lock, so concurrent batches never lose counts.
+CREATE OR REPLACE FUNCTION merge_review_stats(changes JSONB)
+RETURNS VOID AS $$
+  WITH changed AS (
+    SELECT
+      (c->>'place_id')::uuid AS place_id,
+      (c->>'sign')::int AS sign,
+      (c->>'safety_rating')::int AS safety_rating,
+      (c->>'overall_rating')::int AS overall_rating,
+      COALESCE(c->'tags', '[]'::jsonb) AS tags
+    FROM jsonb_array_elements(COALESCE(changes, '[]'::jsonb)) AS c
+  ),
+  per_place AS (
+    SELECT
+      place_id,
+      SUM(sign) AS review_count,
+      SUM(sign * safety_rating) AS safety_rating_sum,
+      COALESCE(SUM(sign) FILTER (WHERE overall_rating IS NOT NULL), 0) AS overall_rating_count,
+      COALESCE(SUM(sign * overall_rating), 0) AS overall_rating_sum
+    FROM changed
+    GROUP BY place_id
+  ),
+  histograms AS (
+    SELECT place_id, jsonb_object_agg(safety_rating::text, n) AS rating_histogram
+    FROM (SELECT place_id, safety_rating, SUM(sign) AS n FROM changed GROUP BY 1, 2) h
+    GROUP BY place_id
+  ),
+  tag_totals AS (
+    SELECT place_id, jsonb_object_agg(tag, n) AS tag_counts
+    FROM (
+      SELECT place_id, tag, SUM(sign) AS n
+      FROM changed, jsonb_array_elements_text(CASE WHEN jsonb_typeof(tags) = 'array' THEN tags ELSE '[]'::jsonb END) AS tag
+      GROUP BY 1, 2
+    ) t
+    GROUP BY place_id
+  )
+  INSERT INTO place_review_stats AS s (
+    place_id, review_count, safety_rating_sum, overall_rating_count, overall_rating_sum,
+    rating_histogram, tag_counts
+  )
+  SELECT
+    p.place_id, p.review_count, p.safety_rating_sum, p.overall_rating_count, p.overall_rating_sum,
+    jsonb_add_counts('{"1": 0, "2": 0, "3": 0, "4": 0, "5": 0}', h.rating_histogram),
+    COALESCE(t.tag_counts, '{}'::jsonb)
+  FROM per_place p
+  JOIN histograms h USING (place_id)
+  LEFT JOIN tag_totals t USING (place_id)
+  -- reviews removed by ON DELETE CASCADE from places have no stats row to update
+  WHERE EXISTS (SELECT 1 FROM places WHERE places.id = p.place_id)
+  ON CONFLICT (place_id) DO UPDATE SET
+    review_count = s.review_count + EXCLUDED.review_count,
+    safety_rating_sum = s.safety_rating_sum + EXCLUDED.safety_rating_sum,
+    overall_rating_count = s.overall_rating_count + EXCLUDED.overall_rating_count,
+    overall_rating_sum = s.overall_rating_sum + EXCLUDED.overall_rating_sum,
+    rating_histogram = jsonb_add_counts(s.rating_histogram, EXCLUDED.rating_histogram),
+    tag_counts = jsonb_add_counts(s.tag_counts, EXCLUDED.tag_counts),
+    updated_at = NOW();
+$$ LANGUAGE sql;
+
+
+-- Statement-level trigger: one merge per INSERT/UPDATE/DELETE statement
+CREATE OR REPLACE FUNCTION sync_review_stats()
+RETURNS TRIGGER AS $$
+DECLARE
+  changes JSONB;
+BEGIN
+  IF TG_OP = 'INSERT' THEN
+    SELECT jsonb_agg(to_jsonb(r) || '{"sign": 1}') INTO changes FROM new_reviews r;
+  ELSIF TG_OP = 'DELETE' THEN
+    SELECT jsonb_agg(to_jsonb(r) || '{"sign": -1}') INTO changes FROM old_reviews r;
+  ELSE
+    SELECT jsonb_agg(c) INTO changes FROM (
+      SELECT to_jsonb(r) || '{"sign": -1}' AS c FROM old_reviews r
+      UNION ALL
+      SELECT to_jsonb(r) || '{"sign": 1}' AS c FROM new_reviews r
+    ) u;
+  END IF;
+  PERFORM merge_review_stats(changes);
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER review_stats_after_insert AFTER INSERT ON place_reviews
+  REFERENCING NEW TABLE AS new_reviews
+  FOR EACH STATEMENT EXECUTE FUNCTION sync_review_stats();
+
+CREATE TRIGGER review_stats_after_update AFTER UPDATE ON place_reviews
+  REFERENCING OLD TABLE AS old_reviews NEW TABLE AS new_reviews
+  FOR EACH STATEMENT EXECUTE FUNCTION sync_review_stats();
+
+CREATE TRIGGER review_stats_after_delete AFTER DELETE ON place_reviews
+  REFERENCING OLD TABLE AS old_reviews
+  FOR EACH STATEMENT EXECUTE FUNCTION sync_review_stats();
+
+
+-- Recompute place_review_stats from all reviews (e.g. after adding the table to
+-- an existing database): SELECT rebuild_place_review_stats();
+CREATE OR REPLACE FUNCTION rebuild_place_review_stats()
+RETURNS VOID AS $$
+BEGIN
+  LOCK TABLE place_reviews IN SHARE MODE;
+  DELETE FROM place_review_stats;
+  PERFORM merge_review_stats((SELECT jsonb_agg(to_jsonb(r) || '{"sign": 1}') FROM place_reviews r));
+END;
+$$ LANGUAGE plpgsql;
+
 -- Function to calculate distance between two points
 CREATE OR REPLACE FUNCTION earth_distance(lat1 FLOAT, lng1 FLOAT, lat2 FLOAT, lng2 FLOAT)
 RETURNS FLOAT AS $$
@@ -1,7 +1,11 @@
 import { NextRequest, NextResponse } from "next/server";
 import { getPlaceById, updatePlace, deletePlace } from "@/lib/db/places";
 import { getPlaceSafetyAttributes } from "@/lib/db/attributes";
-import { getPlaceReviews, getReviewStats } from "@/lib/db/reviews";
+import {
+  getPlaceReviews,
+  getReviewStats,
+  getReviewSummary,
+} from "@/lib/db/reviews";
 
 /**
  * GET /api/places/[id] - Get a single place with full details
@@ -25,6 +29,7 @@ export async function GET(
     let safetyAttributes = null;
     let reviews = null;
     let reviewStats = null;
+    let reviewSummary = null;
 
     if (includeDetails === "all" || includeDetails?.includes("safety")) {
       safetyAttributes = await getPlaceSafetyAttributes(params.id);
@@ -39,6 +44,15 @@ export async function GET(
       reviewStats = await getReviewStats(params.id);
     }
 
+    // One precomputed place_review_stats row, independent of the review count
+    if (
+      includeDetails === "all" ||
+      includeDetails?.includes("reviews") ||
+      includeDetails?.includes("summary")
+    ) {
+      reviewSummary = await getReviewSummary(params.id);
+    }
+
     return NextResponse.json({
       success: true,
       data: {
@@ -46,6 +60,7 @@ export async function GET(
         safetyAttributes,
         reviews,
         reviewStats,
+        reviewSummary,
       },
     });
   } catch (error: any) {
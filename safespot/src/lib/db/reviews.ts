@@ -1,6 +1,10 @@
 // Database interface for place reviews
 
-import { PlaceReview, ReviewCreateInput } from "@/types/database";
+import {
+  PlaceReview,
+  PlaceReviewStats,
+  ReviewCreateInput,
+} from "@/types/database";
 import placesData from "@/data/places.json";
 
 /**
@@ -32,6 +36,7 @@ export async function createReview(
   input: ReviewCreateInput
 ): Promise<PlaceReview> {
   // TODO: Replace with actual database insert
+  // (place_review_stats is updated by the place_reviews triggers, nothing to do here)
   const review: PlaceReview = {
     id: `review_${Date.now()}_${Math.random().toString(36).substr(2, 9)}`,
     place_id: input.place_id,
@@ -116,6 +121,83 @@ export async function getReviewStats(placeId: string): Promise<{
   };
 }
 
+/**
+ * Get the precomputed review summary for a place: one place_review_stats row,
+ * kept in sync by triggers on place_reviews, so the cost does not grow with
+ * the number of reviews
+ */
+export async function getReviewSummary(placeId: string): Promise<{
+  total: number;
+  avgSafetyRating: number;
+  avgOverallRating: number;
+  ratingHistogram: Record<string, number>;
+  tagCounts: Record<string, number>;
+}> {
+  // TODO: Replace with actual database query
+  // const { data, error } = await supabase
+  //   .from('place_review_stats')
+  //   .select('*')
+  //   .eq('place_id', placeId)
+  //   .maybeSingle();
+
+  // Temporary: Stats rows rolled up once from the JSON reviews
+  const stats = getJsonReviewStats().get(placeId) ?? emptyReviewStats(placeId);
+
+  const total = stats.review_count;
+  const overallCount = stats.overall_rating_count;
+  return {
+    total,
+    avgSafetyRating:
+      total > 0 ? Math.round((stats.safety_rating_sum / total) * 10) / 10 : 0,
+    avgOverallRating:
+      overallCount > 0
+        ? Math.round((stats.overall_rating_sum / overallCount) * 10) / 10
+        : 0,
+    ratingHistogram: stats.rating_histogram,
+    tagCounts: stats.tag_counts,
+  };
+}
+
+// Stand-in for the place_review_stats table until the database is wired up
+let jsonReviewStats: Map<string, PlaceReviewStats> | null = null;
+
+function getJsonReviewStats(): Map<string, PlaceReviewStats> {
+  if (jsonReviewStats) return jsonReviewStats;
+  jsonReviewStats = new Map();
+  for (const place of placesData.places as any[]) {
+    const stats = emptyReviewStats(place.id);
+    for (const legacy of place.reviews || []) {
+      const r = convertLegacyReview(legacy, place.id);
+      stats.review_count += 1;
+      stats.safety_rating_sum += r.safety_rating;
+      if (r.overall_rating) {
+        stats.overall_rating_count += 1;
+        stats.overall_rating_sum += r.overall_rating;
+      }
+      const level = String(r.safety_rating);
+      stats.rating_histogram[level] = (stats.rating_histogram[level] || 0) + 1;
+      for (const tag of r.tags || []) {
+        stats.tag_counts[tag] = (stats.tag_counts[tag] || 0) + 1;
+      }
+    }
+    jsonReviewStats.set(place.id, stats);
+  }
+  return jsonReviewStats;
+}
+
+function emptyReviewStats(placeId: string): PlaceReviewStats {
+  return {
+    place_id: placeId,
+    review_count: 0,
+    safety_rating_sum: 0,
+    overall_rating_count: 0,
+    overall_rating_sum: 0,
+    rating_histogram: { "1": 0, "2": 0, "3": 0, "4": 0, "5": 0 },
+    tag_counts: {},
+    updated_at: new Date().toISOString(),
+  };
+}
+
 function convertLegacyReview(legacyReview: any, placeId: string): PlaceReview {
   return {
     id: legacyReview.id,
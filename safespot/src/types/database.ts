@@ -92,6 +92,18 @@ export interface PlaceReview {
   user?: User;
 }
 
+// Precomputed per-place rollup of place_reviews (place_review_stats, kept by triggers)
+export interface PlaceReviewStats {
+  place_id: string;
+  review_count: number;
+  safety_rating_sum: number;
+  overall_rating_count: number;
+  overall_rating_sum: number;
+  rating_histogram: Record<string, number>; // safety rating "1".."5" -> count
+  tag_counts: Record<string, number>;
+  updated_at: string;
+}
+
 export interface PlaceSafetyHistory {
   id: string;
   place_id: string;